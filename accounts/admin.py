@@ -1,10 +1,52 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
 from .models import LoginSession
+from .pagination import keyset_page
+
+CURSOR_VAR = 'cursor'
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Pages the default (newest first) ordering by keyset instead of COUNT + OFFSET.
+    Sorting by a column header falls back to Django's regular pagination.
+    """
+
+    def get_results(self, request):
+        self.keyset = ORDER_VAR not in self.params
+        if not self.keyset:
+            return super().get_results(request)
+        self.result_list, self.next_cursor = keyset_page(
+            self.queryset, getattr(request, 'keyset_cursor', None), self.list_per_page
+        )
+        self.result_count = len(self.result_list)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = self.next_cursor is not None
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
 
 # Register your models here.
 @admin.register(LoginSession)
 class LoginSessionAdmin(admin.ModelAdmin):
     list_display = ('user', 'ip_address', 'login_time', 'logout_time', 'is_active', 'user_agent')
     list_filter = ('is_active', 'login_time')
-    search_fields = ('user_name', 'ip_address')
-    
\ No newline at end of file
+    search_fields = ('user__username', 'ip_address')
+    list_select_related = ('user',)
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def changelist_view(self, request, extra_context=None):
+        # ChangeList rejects query parameters it does not know, so take the cursor out first
+        if CURSOR_VAR in request.GET:
+            request.keyset_cursor = request.GET[CURSOR_VAR]
+            request.GET = request.GET.copy()
+            del request.GET[CURSOR_VAR]
+        return super().changelist_view(request, extra_context)
@@ -0,0 +1,148 @@
+"""
+Write-behind LoginSession audit log. Login and logout events are buffered
+per worker and written by a background thread, so auth requests make no
+audit writes: logins as one bulk INSERT, logouts as PendingLogout rows.
+
+A logout can reach a different worker than its login while the login is
+still waiting in the first worker's buffer, so closing sessions with an
+UPDATE at logout time would miss it. Instead every flush, in any worker,
+applies all pending logouts to the sessions that exist by then, with a few
+set-based UPDATEs. A keyed logout is settled once its session row exists;
+"log out everywhere" keeps closing sessions that started before it until
+LOGIN_AUDIT_LOGOUT_GRACE has passed.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from core_app.flusher import WriteBehindBuffer
+from .models import LoginSession, PendingLogout
+
+
+class LoginAuditBuffer(WriteBehindBuffer):
+    thread_name = "login-audit"
+
+    def __init__(self, batch_size=1000, **kwargs):
+        super().__init__(**kwargs)
+        self.batch_size = batch_size
+        self._logins = {}
+        self._logouts = {}
+        self._logout_all = {}
+
+    def record_login(self, user_id, session_key, ip_address, user_agent):
+        with self.lock:
+            # Keyed by (user, session): repeated events for one session collapse into one row
+            self._logins[(user_id, session_key)] = LoginSession(
+                user_id=user_id,
+                session_key=session_key,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                login_time=timezone.now(),
+            )
+            size = self._pending()
+        self.added(size)
+
+    def record_logout(self, user_id, session_key):
+        """ A session_key of None closes the user's most recent active session. """
+        now = timezone.now()
+        with self.lock:
+            login = self._logins.get((user_id, session_key))
+            if login is not None:
+                # Still buffered: close it before it is ever written
+                login.is_active, login.logout_time = False, now
+            else:
+                self._logouts[(user_id, session_key)] = now
+            size = self._pending()
+        self.added(size)
+
+    def record_logout_all(self, user_id):
+        now = timezone.now()
+        with self.lock:
+            for (login_user_id, _), login in self._logins.items():
+                if login_user_id == user_id and login.is_active:
+                    login.is_active, login.logout_time = False, now
+            self._logout_all[user_id] = now
+            size = self._pending()
+        self.added(size)
+
+    def _pending(self):
+        return len(self._logins) + len(self._logouts) + len(self._logout_all)
+
+    def take(self):
+        pending = (list(self._logins.values()), self._logouts, self._logout_all)
+        self._logins, self._logouts, self._logout_all = {}, {}, {}
+        return pending if any(pending) else None
+
+    def requeue(self, pending):
+        logins, logouts, logout_all = pending
+        # Anything recorded since take() is newer and wins
+        for login in logins:
+            self._logins.setdefault((login.user_id, login.session_key), login)
+        for key, when in logouts.items():
+            self._logouts.setdefault(key, when)
+        for user_id, when in logout_all.items():
+            self._logout_all.setdefault(user_id, when)
+
+    def write(self, pending):
+        logins, logouts, logout_all = pending
+        with transaction.atomic():
+            LoginSession.objects.bulk_create(logins, batch_size=self.batch_size)
+            PendingLogout.objects.bulk_create(
+                [
+                    PendingLogout(
+                        user_id=user_id,
+                        session_key=session_key,
+                        kind='Session' if session_key else 'Latest',
+                        logout_time=when,
+                    )
+                    for (user_id, session_key), when in logouts.items()
+                ] + [
+                    PendingLogout(user_id=user_id, kind='All', logout_time=when)
+                    for user_id, when in logout_all.items()
+                ],
+                batch_size=self.batch_size,
+            )
+            apply_pending_logouts()
+
+
+def apply_pending_logouts():
+    """ Closes the sessions every PendingLogout refers to, then drops the settled ones. """
+    if not PendingLogout.objects.exists():
+        return
+    for_user = PendingLogout.objects.filter(user_id=OuterRef('user_id')).order_by('logout_time')
+    # Matched by key alone: the two workers' clocks need not agree
+    by_key = for_user.filter(kind='Session', session_key=OuterRef('session_key')).values('logout_time')[:1]
+    by_user = for_user.filter(kind='All', logout_time__gte=OuterRef('login_time')).values('logout_time')[:1]
+    for match in (by_key, by_user):
+        LoginSession.objects.filter(Exists(match), is_active=True).update(
+            is_active=False, logout_time=Subquery(match)
+        )
+
+    # No key was known: close the user's latest session that started before the logout
+    settled = []
+    for logout in PendingLogout.objects.filter(kind='Latest'):
+        latest = (
+            LoginSession.objects.filter(user_id=logout.user_id, is_active=True, login_time__lte=logout.logout_time)
+            .order_by('-login_time')
+            .values('id')[:1]
+        )
+        if LoginSession.objects.filter(id__in=latest).update(is_active=False, logout_time=logout.logout_time):
+            settled.append(logout.pk)
+
+    grace = timedelta(seconds=getattr(settings, 'LOGIN_AUDIT_LOGOUT_GRACE', 600))
+    session_written = LoginSession.objects.filter(user_id=OuterRef('user_id'), session_key=OuterRef('session_key'))
+    PendingLogout.objects.filter(
+        Q(Exists(session_written), kind='Session')
+        | Q(pk__in=settled)
+        | Q(logout_time__lt=timezone.now() - grace)
+    ).delete()
+
+
+login_audit = LoginAuditBuffer(
+    interval=getattr(settings, 'LOGIN_AUDIT_FLUSH_INTERVAL', 2),
+    max_pending=getattr(settings, 'LOGIN_AUDIT_MAX_PENDING', 500),
+    enabled=getattr(settings, 'LOGIN_AUDIT_BUFFERED', True),
+)
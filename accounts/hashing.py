@@ -0,0 +1,62 @@
+"""
+Password hashing for the async auth views.
+
+Django's async auth helpers still run PBKDF2 on the event-loop thread, so one
+login stalls every other connection on the worker. These helpers hand the
+hash to a bounded thread pool instead; hashlib releases the GIL while it
+hashes, so PASSWORD_HASH_WORKERS threads really do hash in parallel.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password, verify_password
+from django.contrib.auth.signals import user_login_failed
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        workers = getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+    return _executor
+
+
+async def run_hasher(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def amake_password(raw_password):
+    return await run_hasher(make_password, raw_password)
+
+
+async def aauthenticate_user(request, username, password):
+    """
+    Async counterpart of authenticate() for the ModelBackend: the user lookup
+    goes through the async ORM and the hash runs off the event loop.
+    """
+    User = get_user_model()
+    try:
+        user = await User._default_manager.aget_by_natural_key(username)
+    except User.DoesNotExist:
+        # Hash anyway so unknown usernames take as long as wrong passwords
+        await amake_password(password)
+        user = None
+    else:
+        is_correct, must_update = await run_hasher(verify_password, password, user.password)
+        if is_correct and must_update:
+            user.password = await amake_password(password)
+            await user.asave(update_fields=['password'])
+        if not (is_correct and user.is_active):
+            user = None
+    if user is None:
+        await user_login_failed.asend(
+            sender=__name__, credentials={'username': username}, request=request
+        )
+    return user
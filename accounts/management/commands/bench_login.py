@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import login
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from accounts.audit import login_audit
+from accounts.models import LoginSession
+from accounts.views import async_login_view, login_view
+from core_app.benchmarks import format_latency, timed
+
+BENCH_AGENT = "bench_login"
+BENCH_PASSWORD = "bench-login-password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures django.contrib.auth.login() latency under concurrent logins, or with --views, "
+        "logins/second through the sync and async login views on one event loop (one ASGI worker)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--logins', type=int, default=50, help="Logins per thread, or in total with --views.")
+        parser.add_argument('--views', action='store_true', help="Compare login_view and async_login_view.")
+        parser.add_argument('--concurrency', type=int, default=16, help="In-flight requests with --views.")
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(
+            username=f"bench-{uuid.uuid4().hex[:12]}",
+            email="bench@example.com",
+            password=BENCH_PASSWORD if options['views'] else None,
+        )
+        self.session_keys = []
+        try:
+            if options['views']:
+                self.bench_views(user, options)
+            else:
+                self.bench_login(user, options)
+        finally:
+            login_audit.flush()
+            self.session_keys += LoginSession.objects.filter(user=user).values_list('session_key', flat=True)
+            SessionStore.get_model_class().objects.filter(session_key__in=self.session_keys).delete()
+            user.delete()
+
+    def bench_login(self, user, options):
+        samples = []
+        lock = threading.Lock()
+
+        def run():
+            factory = RequestFactory()
+            local = []
+            try:
+                for _ in range(options['logins']):
+                    request = factory.post('/login/', HTTP_USER_AGENT=BENCH_AGENT)
+                    request.session = SessionStore()
+                    _, elapsed = timed(login, request, user)
+                    local.append(elapsed)
+            finally:
+                connection.close()
+            with lock:
+                samples.extend(local)
+
+        threads = [threading.Thread(target=run) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stdout.write(format_latency(f"login() x{options['threads']} threads", samples))
+
+    def bench_views(self, user, options):
+        factory = RequestFactory()
+
+        def make_request():
+            request = factory.post(
+                '/login/', {'username': user.username, 'password': BENCH_PASSWORD}, HTTP_USER_AGENT=BENCH_AGENT
+            )
+            request.session = SessionStore()
+            request._messages = FallbackStorage(request)
+            return request
+
+        async def run(view):
+            semaphore = asyncio.Semaphore(options['concurrency'])
+
+            async def one():
+                async with semaphore:
+                    request = make_request()
+                    response = await view(request)
+                    if response.status_code != 302:
+                        raise RuntimeError(f"login failed with status {response.status_code}")
+                    self.session_keys.append(request.session.session_key)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(options['logins'])))
+            return options['logins'] / (time.perf_counter() - start)
+
+        # Sync views run in ASGI's single thread-sensitive executor, just like here
+        sync_view = sync_to_async(login_view)
+        with override_settings(
+            LOGIN_THROTTLE_ENABLED=False, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+        ):
+            for label, view in (("sync login_view", sync_view), ("async_login_view", async_login_view)):
+                rate = asyncio.run(run(view))
+                self.stdout.write(f"{label}: {rate:.1f} logins/s at concurrency {options['concurrency']}")
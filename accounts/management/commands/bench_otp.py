@@ -0,0 +1,65 @@
+import threading
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from core_app.benchmarks import format_latency, timed
+
+
+class Command(BaseCommand):
+    help = "Measures 2FA code issue/verify latency for an OTP store under concurrent logins."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--store', default='accounts.otp.DBOTPStore')
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--rounds', type=int, default=5, help="Issue/verify rounds per user.")
+
+    def handle(self, *args, **options):
+        store = import_string(options['store'])()
+        prefix = f"bench-otp-{uuid.uuid4().hex[:8]}"
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}-{i}", password="!") for i in range(options['users'])]
+        )
+        user_ids = [user.id for user in users]
+        issue_ns, verify_ns, wrong_ns = [], [], []
+        lock = threading.Lock()
+
+        def run(ids):
+            issued, verified, wrong = [], [], []
+            try:
+                for _ in range(options['rounds']):
+                    for user_id in ids:
+                        code, elapsed = timed(store.issue, user_id)
+                        issued.append(elapsed)
+                        bad = f"{(int(code) + 1) % 1000000:06d}"
+                        ok, elapsed = timed(store.verify, user_id, bad)
+                        wrong.append(elapsed)
+                        ok, elapsed = timed(store.verify, user_id, code)
+                        verified.append(elapsed)
+                        if not ok:
+                            raise RuntimeError(f"valid code rejected for user {user_id}")
+            finally:
+                connection.close()
+            with lock:
+                issue_ns.extend(issued)
+                verify_ns.extend(verified)
+                wrong_ns.extend(wrong)
+
+        threads = [
+            threading.Thread(target=run, args=(user_ids[i::options['threads']],))
+            for i in range(options['threads'])
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.stdout.write(format_latency("issue", issue_ns))
+            self.stdout.write(format_latency("verify (wrong code)", wrong_ns))
+            self.stdout.write(format_latency("verify (consume)", verify_ns))
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
@@ -0,0 +1,82 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from accounts.models import UserSession
+from accounts.sessions import (
+    SessionStore, revoke_tenant_sessions, revoke_user_sessions, session_cache_key, shared_cache,
+)
+
+
+class Command(BaseCommand):
+    help = "Times revoking all sessions of users (and of a tenant) that have thousands of sessions each."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--sessions', type=int, default=5000, help="Sessions per user.")
+
+    def handle(self, *args, **options):
+        if shared_cache() is None:
+            raise CommandError(f"SESSION_CACHE_ALIAS {settings.SESSION_CACHE_ALIAS!r} is not a shared cache.")
+        # A separate client on the same cache, standing in for another worker
+        self.other_worker = caches.create_connection(settings.SESSION_CACHE_ALIAS)
+        prefix = f"bench-revoke-{uuid.uuid4().hex[:8]}"
+        schema_name = prefix.replace('-', '_')
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}-{i}", password="!") for i in range(options['users'])]
+        )
+        try:
+            keys_by_user = {user.pk: self.make_sessions(user, schema_name, options['sessions']) for user in users}
+            first, rest = users[0], users[1:]
+
+            start = time.perf_counter()
+            revoked = revoke_user_sessions([first.pk])
+            self.report("1 user", revoked, start, keys_by_user[first.pk], schema_name)
+
+            start = time.perf_counter()
+            revoked = revoke_tenant_sessions([schema_name])
+            remaining = [key for user in rest for key in keys_by_user[user.pk]]
+            self.report(f"tenant ({len(rest)} users)", revoked, start, remaining, schema_name)
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
+
+    def make_sessions(self, user, schema_name, count):
+        store = SessionStore()
+        expire_date = timezone.now() + timedelta(days=1)
+        session_data = store.encode({'_auth_user_id': str(user.pk)})
+        rows = [
+            UserSession(
+                session_key=get_random_string(32),
+                session_data=session_data,
+                expire_date=expire_date,
+                user=user,
+                schema_name=schema_name,
+            )
+            for _ in range(count)
+        ]
+        UserSession.objects.bulk_create(rows, batch_size=1000)
+        # Warm the shared cache as if every session had served requests
+        caches[settings.SESSION_CACHE_ALIAS].set_many(
+            {session_cache_key(row.session_key, schema_name): (session_data, expire_date) for row in rows}
+        )
+        return [row.session_key for row in rows]
+
+    def report(self, label, revoked, start, keys, schema_name):
+        elapsed = time.perf_counter() - start
+        left_in_db = UserSession.objects.filter(session_key__in=keys).count()
+        left_in_cache = len(self.other_worker.get_many(
+            [session_cache_key(key, schema_name) for key in keys]
+        ))
+        if len(keys) != revoked or left_in_db or left_in_cache:
+            raise CommandError(
+                f"{label}: revoked {revoked} of {len(keys)}, {left_in_db} left in the database, "
+                f"{left_in_cache} still cached for other workers"
+            )
+        self.stdout.write(f"{label}: revoked {revoked} sessions in {elapsed * 1000:.1f}ms")
@@ -0,0 +1,53 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core_app.benchmarks import format_latency, timed
+
+ENGINES = ("django.contrib.sessions.backends.db", "accounts.sessions")
+
+
+class Command(BaseCommand):
+    help = "Compares session queries per request for the plain DB engine and the tiered accounts.sessions engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--write-every', type=int, default=20, help="Modify the session every Nth request.")
+        parser.add_argument(
+            '--save-every-request', action='store_true', help="Save unmodified sessions too (SESSION_SAVE_EVERY_REQUEST)."
+        )
+
+    def handle(self, *args, **options):
+        for engine in ENGINES:
+            self.bench(engine, options)
+
+    def bench(self, engine, options):
+        SessionStore = import_module(engine).SessionStore
+        session = SessionStore()
+        session['pending_user'] = 0
+        session.save()
+        session_key = session.session_key
+
+        def handle_request(i):
+            # What SessionMiddleware does around a view that reads the session
+            store = SessionStore(session_key)
+            store.get('pending_user')
+            if i % options['write_every'] == 0:
+                store['pending_user'] = i
+            if store.modified or options['save_every_request']:
+                store.save()
+
+        samples = []
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                for i in range(1, options['requests'] + 1):
+                    _, elapsed = timed(handle_request, i)
+                    samples.append(elapsed)
+        finally:
+            SessionStore(session_key).delete()
+        table = SessionStore.get_model_class()._meta.db_table
+        session_queries = sum(1 for query in queries.captured_queries if table in query['sql'])
+        self.stdout.write(format_latency(engine, samples))
+        self.stdout.write(f"  session queries/request: {session_queries / options['requests']:.3f}")
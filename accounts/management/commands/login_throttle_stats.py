@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from accounts.throttle import login_throttle
+
+
+class Command(BaseCommand):
+    help = "Reports login attempts rejected by the throttle and the password-hashing CPU they would have cost."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Zero the counters after reporting.")
+
+    def handle(self, *args, **options):
+        stats = login_throttle.stats()
+        self.stdout.write(
+            f"Rejected: {stats['rejected_by_ip']} by IP, {stats['rejected_by_username']} by username\n"
+            f"authenticate(): {stats['authenticate_calls']} calls, "
+            f"mean {stats['mean_authenticate_ms']:.1f}ms\n"
+            f"Hashing CPU avoided: ~{stats['cpu_seconds_avoided']:.1f}s"
+        )
+        if options['reset']:
+            login_throttle.reset_stats()
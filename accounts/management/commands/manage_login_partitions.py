@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from accounts.partitions import add_months, archive_partition, create_partition, existing_partitions, month_start
+
+
+class Command(BaseCommand):
+    help = "Creates upcoming monthly LoginSession partitions and archives months past the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=getattr(settings, 'LOGIN_SESSION_PARTITIONS_AHEAD', 3),
+            help="Months ahead of the current one to create.",
+        )
+        parser.add_argument(
+            '--retain-months', type=int, default=getattr(settings, 'LOGIN_SESSION_RETENTION_MONTHS', 12),
+            help="Months kept in the live table, including the current one.",
+        )
+        parser.add_argument('--no-archive', action='store_true')
+
+    def handle(self, *args, **options):
+        connection.set_schema_to_public()
+        current = month_start(timezone.now())
+        partitions = existing_partitions()
+
+        for offset in range(options['ahead'] + 1):
+            month = add_months(current, offset)
+            if month not in partitions:
+                create_partition(month)
+                self.stdout.write(f"Created partition for {month:%Y-%m}.")
+
+        if options['no_archive']:
+            return
+        cutoff = add_months(current, 1 - options['retain_months'])
+        for month in sorted(partitions):
+            if month < cutoff:
+                path = archive_partition(month)
+                self.stdout.write(f"Archived {month:%Y-%m} to {path}.")
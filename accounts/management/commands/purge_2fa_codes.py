@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import TwoFactorCode
+
+
+class Command(BaseCommand):
+    help = "Deletes used and expired 2FA codes in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'OTP_TTL', 600))
+        dead = TwoFactorCode.objects.filter(Q(is_used=True) | Q(created_at__lt=cutoff))
+        total = 0
+        # Short batches keep each DELETE's locks and WAL small on a large table
+        while True:
+            ids = list(dead.values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            total += TwoFactorCode.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(f"Purged {total} 2FA code(s).")
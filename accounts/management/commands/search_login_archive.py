@@ -0,0 +1,33 @@
+import csv
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.partitions import read_archive
+
+
+def parse_date(value):
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=dt_timezone.utc)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value!r} (use YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = "Prints archived LoginSession rows as CSV (see manage_login_partitions)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', required=True, help="YYYY-MM-DD (UTC), inclusive.")
+        parser.add_argument('--until', help="YYYY-MM-DD (UTC), exclusive. Defaults to now.")
+        parser.add_argument('--user-id', type=int)
+
+    def handle(self, *args, **options):
+        since = parse_date(options['since'])
+        until = parse_date(options['until']) if options['until'] else timezone.now()
+        writer = None
+        for row in read_archive(since, until, user_id=options['user_id']):
+            if writer is None:
+                writer = csv.DictWriter(self.stdout, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.notifications import dispatch_login_notifications
+
+
+class Command(BaseCommand):
+    help = "Sends the coalesced once-a-day 'Login Successful' emails for recent logins."
+
+    def handle(self, *args, **options):
+        sent = dispatch_login_notifications()
+        self.stdout.write(f"Queued {sent} login notification(s).")
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="twofactorcode",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="twofactorcode",
+            index=models.Index(
+                fields=["user", "is_used", "created_at"],
+                name="accounts_tw_user_id_7b3034_idx",
+            ),
+        ),
+    ]
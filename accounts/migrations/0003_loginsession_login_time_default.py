@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:38
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_twofactorcode_attempts"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="loginsession",
+            name="login_time",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
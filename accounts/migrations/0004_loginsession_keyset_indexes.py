@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_loginsession_login_time_default"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="loginsession",
+            index=models.Index(
+                fields=["user", "login_time", "id"], name="loginsession_user_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loginsession",
+            index=models.Index(
+                fields=["login_time", "id"], name="loginsession_time_idx"
+            ),
+        ),
+    ]
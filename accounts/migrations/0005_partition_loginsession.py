@@ -0,0 +1,92 @@
+# Converts accounts_loginsession into a table range-partitioned by month on
+# login_time. Django's model state is unchanged; new partitions are created
+# and old ones archived by `manage.py manage_login_partitions`.
+
+from django.db import migrations
+
+PARTITION_SQL = """
+DO $$
+DECLARE
+    defs text[];
+    ddl text;
+    part_start timestamptz;
+    part_end timestamptz := date_trunc('month', now()) + interval '3 months';
+BEGIN
+    ALTER TABLE accounts_loginsession RENAME TO accounts_loginsession_old;
+
+    -- Secondary indexes and foreign keys, re-pointed at the new table and
+    -- re-created once the old table (and its names) are gone
+    defs := ARRAY(
+        SELECT replace(
+            indexdef,
+            ' ON ' || quote_ident(current_schema()) || '.accounts_loginsession_old ',
+            ' ON accounts_loginsession '
+        )
+        FROM pg_indexes
+        WHERE schemaname = current_schema()
+          AND tablename = 'accounts_loginsession_old'
+          AND indexname NOT IN (
+              SELECT conname FROM pg_constraint
+              WHERE conrelid = 'accounts_loginsession_old'::regclass
+          )
+    ) || ARRAY(
+        SELECT format(
+            'ALTER TABLE accounts_loginsession ADD CONSTRAINT %I %s',
+            conname, pg_get_constraintdef(oid)
+        )
+        FROM pg_constraint
+        WHERE conrelid = 'accounts_loginsession_old'::regclass AND contype = 'f'
+    );
+
+    CREATE TABLE accounts_loginsession (LIKE accounts_loginsession_old INCLUDING DEFAULTS)
+        PARTITION BY RANGE (login_time);
+
+    -- Identity columns are not supported on partitioned tables (before PG 17),
+    -- so ids come from a plain sequence owned by the column
+    ALTER TABLE accounts_loginsession ALTER COLUMN id DROP DEFAULT;
+    CREATE SEQUENCE accounts_loginsession_id_seq_new;
+    ALTER TABLE accounts_loginsession
+        ALTER COLUMN id SET DEFAULT nextval('accounts_loginsession_id_seq_new');
+
+    -- Catches rows outside every monthly partition
+    CREATE TABLE accounts_loginsession_default PARTITION OF accounts_loginsession DEFAULT;
+
+    part_start := date_trunc('month', COALESCE((SELECT min(login_time) FROM accounts_loginsession_old), now()));
+    WHILE part_start <= part_end LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF accounts_loginsession FOR VALUES FROM (%L) TO (%L)',
+            'accounts_loginsession_p' || to_char(part_start, 'YYYYMM'), part_start, part_start + interval '1 month'
+        );
+        part_start := part_start + interval '1 month';
+    END LOOP;
+
+    INSERT INTO accounts_loginsession SELECT * FROM accounts_loginsession_old;
+    PERFORM setval(
+        'accounts_loginsession_id_seq_new',
+        (SELECT COALESCE(max(id), 0) + 1 FROM accounts_loginsession_old),
+        false
+    );
+
+    DROP TABLE accounts_loginsession_old;
+    ALTER SEQUENCE accounts_loginsession_id_seq_new RENAME TO accounts_loginsession_id_seq;
+    ALTER SEQUENCE accounts_loginsession_id_seq OWNED BY accounts_loginsession.id;
+
+    -- The partition key has to be part of the primary key
+    ALTER TABLE accounts_loginsession
+        ADD CONSTRAINT accounts_loginsession_pkey PRIMARY KEY (id, login_time);
+    FOREACH ddl IN ARRAY defs LOOP
+        EXECUTE ddl;
+    END LOOP;
+END $$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_loginsession_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITION_SQL),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_usersession"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingLogout",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("session_key", models.CharField(blank=True, max_length=40, null=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("Session", "Session"),
+                            ("Latest", "Latest"),
+                            ("All", "All"),
+                        ],
+                        default="Session",
+                        max_length=10,
+                    ),
+                ),
+                ("logout_time", models.DateTimeField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "session_key"],
+                        name="accounts_pe_user_id_f4d794_idx",
+                    ),
+                    models.Index(
+                        fields=["logout_time"], name="accounts_pe_logout__e934cb_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -1,8 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.sessions.base_session import AbstractBaseSession
 from datetime import timedelta
 from django.utils import timezone
-import random
 
 
 # Create your models here.
@@ -11,10 +11,18 @@ class LoginSession(models.Model):
     ip_address = models.GenericIPAddressField()
     user_agent = models.CharField(max_length=255, blank=True, null=True)
     session_key = models.CharField(max_length=40, blank=True, null=True, db_index=True)
-    login_time = models.DateTimeField(auto_now_add = True)
+    # Set by the audit buffer at login time, not when the row is finally written
+    login_time = models.DateTimeField(default=timezone.now)
     logout_time = models.DateTimeField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination (accounts.pagination): per user, and across users in the admin
+            models.Index(fields=['user', 'login_time', 'id'], name='loginsession_user_time_idx'),
+            models.Index(fields=['login_time', 'id'], name='loginsession_time_idx'),
+        ]
+
     def duration(self):
         """ Returns the duration of the session in seconds. """
         end = self.logout_time or timezone.now()
@@ -27,18 +35,51 @@ class LoginSession(models.Model):
         return f"{self.user.username} logged in @ {self.login_time: %Y-%m-%d %H:%M:%S}" 
     
 
+class PendingLogout(models.Model):
+    """
+    A logout recorded by accounts.audit, kept until it has been applied to its
+    LoginSession. The login may still be buffered in another worker when the
+    logout is written, so each flush re-applies these to rows inserted since.
+    """
+    KIND_CHOICES = [
+        ('Session', 'Session'),  # the session with this key
+        ('Latest', 'Latest'),  # the user's latest session (no key was known)
+        ('All', 'All'),  # every session of the user that started before
+    ]
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    session_key = models.CharField(max_length=40, blank=True, null=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='Session')
+    logout_time = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'session_key']),
+            models.Index(fields=['logout_time']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.kind} logout @ {self.logout_time}"
+
+
 class TwoFactorCode(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     code = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
     is_used = models.BooleanField(default=False)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'is_used', 'created_at']),
+        ]
 
     def is_valid(self):
         return not self.is_used and timezone.now() -self.created_at < timedelta(minutes=10)
     
     @staticmethod
     def generate_code():
-        return str(random.randint(100000, 999999))  
+        from .otp import generate_code
+        return generate_code()
     
 
 
@@ -47,4 +88,18 @@ class UserProfile(models.Model):
     last_login_email = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
-        return self.user.username
\ No newline at end of file
+        return self.user.username
+
+
+class UserSession(AbstractBaseSession):
+    """
+    Session row that also records whose session it is and which tenant served it,
+    so sessions can be revoked in bulk without decoding session_data (accounts.sessions).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='sessions')
+    schema_name = models.CharField(max_length=63, blank=True, db_index=True)
+
+    @classmethod
+    def get_session_store_class(cls):
+        from .sessions import SessionStore
+        return SessionStore
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from core_app.emails.utils import PLAIN_TEXT_BODY
+from .models import UserProfile
+
+NOTIFY_EVERY = timedelta(hours=24)
+
+
+def users_to_notify(now):
+    """
+    Users who logged in during the last 24 hours and have not had a login
+    email in that time. LoginSession rows are the login events, so nothing
+    extra is written on the login path.
+    """
+    window_start = now - NOTIFY_EVERY
+    return (
+        User.objects.filter(login_sessions__login_time__gte=window_start)
+        .filter(Q(userprofile__last_login_email__isnull=True) | Q(userprofile__last_login_email__lt=window_start))
+        .exclude(email='')
+        .distinct()
+        .order_by('id')
+        .values_list('id', 'username', 'email')
+    )
+
+
+def dispatch_login_notifications(batch_size=500):
+    """
+    Sends the coalesced 'Login Successful' emails: at most one per user per
+    day, however many times they logged in. Returns the number sent.
+    """
+    now = timezone.now()
+    template = get_template("emails/login_success.html")
+    use_outbox = getattr(settings, 'EMAIL_OUTBOX_ENABLED', True)
+    users = list(users_to_notify(now))
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        messages = [
+            ("Login Successful", [email], PLAIN_TEXT_BODY, template.render({"user_name": username}))
+            for _, username, email in batch
+        ]
+        user_ids = [user_id for user_id, _, _ in batch]
+        with transaction.atomic():
+            if use_outbox:
+                from mailer.sender import enqueue_many
+                enqueue_many(messages)
+            else:
+                send_now(messages)
+            UserProfile.objects.bulk_create(
+                [UserProfile(user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+            )
+            UserProfile.objects.filter(user_id__in=user_ids).update(last_login_email=now)
+    return len(users)
+
+
+def send_now(messages):
+    connection = get_connection()
+    emails = []
+    for subject, to, body, html_body in messages:
+        email = EmailMultiAlternatives(subject=subject, body=body, to=to, connection=connection)
+        email.attach_alternative(html_body, "text/html")
+        emails.append(email)
+    connection.send_messages(emails)
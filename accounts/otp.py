@@ -0,0 +1,115 @@
+"""
+One-time 2FA codes. The store is chosen by settings.OTP_STORE:
+
+- DBOTPStore keeps codes in the TwoFactorCode table (works with any setup).
+- CacheOTPStore keeps only a salted hash in the cache and relies on its expiry.
+  It needs a cache shared by all workers (Redis/Memcached), not the default locmem.
+
+Both give single-use codes: verify() consumes a code atomically, so two
+concurrent requests with the same code cannot both log in. Wrong guesses
+are counted per user and the code is burnt after OTP_MAX_ATTEMPTS.
+"""
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.module_loading import import_string
+
+from .models import TwoFactorCode
+
+
+def generate_code():
+    return f"{secrets.randbelow(1000000):06d}"
+
+
+class BaseOTPStore:
+    def __init__(self):
+        self.ttl = getattr(settings, 'OTP_TTL', 600)
+        self.max_attempts = getattr(settings, 'OTP_MAX_ATTEMPTS', 5)
+
+    def issue(self, user_id):
+        """ Creates a new code for the user, replacing any earlier one, and returns it. """
+        raise NotImplementedError
+
+    def verify(self, user_id, code):
+        """ Returns True exactly once for a valid, unexpired code. """
+        raise NotImplementedError
+
+
+class CacheOTPStore(BaseOTPStore):
+    key_prefix = "otp"
+
+    def _code_key(self, user_id):
+        return f"{self.key_prefix}:code:{user_id}"
+
+    def _attempts_key(self, user_id):
+        return f"{self.key_prefix}:attempts:{user_id}"
+
+    def _digest(self, user_id, code):
+        return salted_hmac(self.key_prefix, f"{user_id}:{code}").hexdigest()
+
+    def issue(self, user_id):
+        code = generate_code()
+        cache.set_many({
+            self._code_key(user_id): self._digest(user_id, code),
+            self._attempts_key(user_id): 0,
+        }, timeout=self.ttl)
+        return code
+
+    def verify(self, user_id, code):
+        code_key = self._code_key(user_id)
+        digest = cache.get(code_key)
+        if digest is None:
+            return False
+        try:
+            attempts = cache.incr(self._attempts_key(user_id))
+        except ValueError:
+            # Attempts key evicted before the code: treat the code as gone too
+            cache.delete(code_key)
+            return False
+        if attempts > self.max_attempts:
+            cache.delete(code_key)
+            return False
+        if not constant_time_compare(digest, self._digest(user_id, code)):
+            return False
+        # delete() reports whether the key existed, so only one caller can consume it
+        if not cache.delete(code_key):
+            return False
+        cache.delete(self._attempts_key(user_id))
+        return True
+
+
+class DBOTPStore(BaseOTPStore):
+
+    def issue(self, user_id):
+        code = generate_code()
+        # One live code per user: earlier unused codes are dropped, not left to pile up
+        TwoFactorCode.objects.filter(user_id=user_id, is_used=False).delete()
+        TwoFactorCode.objects.create(user_id=user_id, code=code)
+        return code
+
+    def verify(self, user_id, code):
+        live = TwoFactorCode.objects.filter(
+            user_id=user_id,
+            is_used=False,
+            created_at__gte=timezone.now() - timedelta(seconds=self.ttl),
+        )
+        # The UPDATE is the consume: a code can only flip to used once
+        if live.filter(code=code, attempts__lt=self.max_attempts).update(is_used=True):
+            return True
+        live.update(attempts=F('attempts') + 1)
+        return False
+
+
+_store = None
+
+
+def get_otp_store():
+    global _store
+    if _store is None:
+        _store = import_string(getattr(settings, 'OTP_STORE', 'accounts.otp.DBOTPStore'))()
+    return _store
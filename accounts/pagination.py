@@ -0,0 +1,46 @@
+"""
+Keyset (seek) pagination for LoginSession, newest first.
+
+A page is "rows before (login_time, id) of the last row shown", so every page
+is an index range scan of the same size instead of an OFFSET that reads and
+discards everything before it.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+ORDERING = ('-login_time', '-id')
+
+
+def encode_cursor(row):
+    raw = f"{row.login_time.isoformat()}|{row.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """ Returns (login_time, id), or None for a missing or malformed cursor. """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        login_time, pk = raw.split("|")
+        return datetime.fromisoformat(login_time), int(pk)
+    except ValueError:
+        return None
+
+
+def keyset_page(queryset, cursor, page_size):
+    """ Returns (rows, next_cursor); next_cursor is None on the last page. """
+    queryset = queryset.order_by(*ORDERING)
+    position = decode_cursor(cursor)
+    if position is not None:
+        login_time, pk = position
+        # The plain login_time bound is what lets the index seek; the OR resolves ties
+        queryset = queryset.filter(login_time__lte=login_time).filter(
+            Q(login_time__lt=login_time) | Q(id__lt=pk)
+        )
+    rows = list(queryset[:page_size + 1])
+    if len(rows) > page_size:
+        return rows[:page_size], encode_cursor(rows[page_size - 1])
+    return rows, None
@@ -0,0 +1,122 @@
+"""
+Monthly range partitions of accounts_loginsession (see migration 0005).
+
+Upcoming months get their partition ahead of time; months older than the
+retention period are detached, exported to gzip CSV under
+LOGIN_SESSION_ARCHIVE_DIR and dropped, so the live table only holds recent
+months. read_archive() searches the exported files on demand.
+"""
+import csv
+import gzip
+import os
+import re
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+from .models import LoginSession
+
+PARENT = LoginSession._meta.db_table
+DEFAULT_PARTITION = f"{PARENT}_default"
+PARTITION_RE = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    return f"{PARENT}_p{month:%Y%m}"
+
+
+def archive_dir():
+    return Path(getattr(settings, 'LOGIN_SESSION_ARCHIVE_DIR', settings.BASE_DIR / 'archive' / 'login_sessions'))
+
+
+def archive_path(month):
+    return archive_dir() / f"{partition_name(month)}.csv.gz"
+
+
+def existing_partitions():
+    """ Returns {month: partition name} for the attached monthly partitions. """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [PARENT],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            partitions[datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)] = name
+    return partitions
+
+
+def create_partition(month):
+    """
+    Adds the partition for `month`. It is built detached and then attached,
+    so rows that already landed in the default partition can be moved into it.
+    """
+    quote = connection.ops.quote_name
+    name, parent, default = quote(partition_name(month)), quote(PARENT), quote(DEFAULT_PARTITION)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default} WHERE login_time >= %s AND login_time < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            [start, end],
+        )
+        cursor.execute(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+
+
+def _copy_out(cursor, sql, file):
+    if is_psycopg3:
+        with cursor.copy(sql) as copy:
+            for data in copy:
+                file.write(data)
+    else:
+        cursor.copy_expert(sql, file)
+
+
+def archive_partition(month):
+    """ Detaches the month's partition, writes it to a gzip CSV file and drops it. """
+    quote = connection.ops.quote_name
+    name, parent = quote(partition_name(month)), quote(PARENT)
+    path = archive_path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    # One transaction: if the export fails, the partition is still attached
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {parent} DETACH PARTITION {name}")
+        with gzip.open(tmp_path, "wb") as file:
+            _copy_out(cursor, f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", file)
+        os.replace(tmp_path, path)
+        cursor.execute(f"DROP TABLE {name}")
+    return path
+
+
+def read_archive(since, until, user_id=None):
+    """ Yields archived LoginSession rows (as dicts of strings) with since <= login_time < until. """
+    month = month_start(since)
+    while month < until:
+        path = archive_path(month)
+        if path.exists():
+            with gzip.open(path, "rt", newline="") as file:
+                for row in csv.DictReader(file):
+                    if user_id is not None and row['user_id'] != str(user_id):
+                        continue
+                    login_time = datetime.fromisoformat(row['login_time'])
+                    if since <= login_time < until:
+                        yield row
+        month = add_months(month, 1)
@@ -0,0 +1,249 @@
+"""
+Tiered session engine (SESSION_ENGINE = "accounts.sessions").
+
+Reads go L1 (per-process, SESSION_L1_TTL seconds) -> L2 (the shared cache)
+-> database, so a typical request reads its session without a query. Writes
+go to the database and refresh both caches; a save that changes neither the
+data nor the expiry by more than SESSION_WRITE_COALESCE seconds is skipped.
+
+L2 is caches[SESSION_CACHE_ALIAS] and must be shared by every worker
+(Redis/Memcached), otherwise a session deleted in one worker would still be
+served from another worker's copy. A per-process backend (locmem, dummy) is
+therefore not used as L2 at all. L2 entries live for at most SESSION_L2_TTL
+seconds, not the session age, which bounds how long a missed eviction lasts.
+
+Cache keys include the tenant schema serving the request, so the same
+session key on two tenant hosts never shares a cached entry. L1 entries are
+only invalidated in the process that wrote them, so other workers can serve
+a just-changed session for up to SESSION_L1_TTL seconds; keep it short.
+
+Rows live in accounts.UserSession, which stores the user and tenant schema
+next to the data, so revoke_user_sessions() / revoke_tenant_sessions() can
+delete every matching session in one statement.
+"""
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.utils import timezone
+
+from core_app.lru import TTLCache
+
+KEY_PREFIX = "accounts.sessions"
+
+logger = logging.getLogger(__name__)
+
+local_sessions = TTLCache(
+    max_size=getattr(settings, 'SESSION_L1_MAX_SIZE', 10000),
+    ttl=getattr(settings, 'SESSION_L1_TTL', 2),
+)
+
+
+_warned_private_cache = False
+
+
+def shared_cache():
+    """ The L2 cache, or None when SESSION_CACHE_ALIAS is private to this process. """
+    cache = caches[settings.SESSION_CACHE_ALIAS]
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        global _warned_private_cache
+        if not _warned_private_cache:
+            _warned_private_cache = True
+            logger.warning(
+                "SESSION_CACHE_ALIAS %r is not shared between workers; sessions are read from the database",
+                settings.SESSION_CACHE_ALIAS,
+            )
+        return None
+    return cache
+
+
+def _l2_timeout(expiry_age):
+    return max(0, min(expiry_age, getattr(settings, 'SESSION_L2_TTL', 300)))
+
+
+def session_cache_key(session_key, schema_name=None):
+    schema_name = schema_name or getattr(connection, 'schema_name', 'public')
+    return f"{KEY_PREFIX}:{schema_name}:{session_key}"
+
+
+class SessionStore(DBStore):
+
+    @classmethod
+    def get_model_class(cls):
+        from .models import UserSession
+        return UserSession
+
+    def __init__(self, session_key=None):
+        self._cache = shared_cache()
+        # (serialized data, expire_date) as last read from or written to a tier
+        self._stored = None
+        super().__init__(session_key)
+
+    @property
+    def cache_key(self):
+        return session_cache_key(self._get_or_create_session_key())
+
+    def _snapshot(self, data):
+        return self.serializer().dumps(data)
+
+    def _remember(self, key, session_data, expire_date, data):
+        entry = (session_data, expire_date)
+        local_sessions.set(key, entry)
+        self._stored = (self._snapshot(data), expire_date)
+        return entry
+
+    def load(self):
+        key = session_cache_key(self.session_key)
+        entry = local_sessions.get(key)
+        if entry is None:
+            entry = self._cache_get(key)
+            if entry is None:
+                s = self._get_session_from_db()
+                if s is None:
+                    return {}
+                entry = (s.session_data, s.expire_date)
+                self._cache_set(key, entry, s.expire_date)
+            local_sessions.set(key, entry)
+        session_data, expire_date = entry
+        if expire_date <= timezone.now():
+            self._session_key = None
+            return {}
+        data = self.decode(session_data)
+        self._stored = (self._snapshot(data), expire_date)
+        return data
+
+    def _cache_get(self, key):
+        if self._cache is None:
+            return None
+        try:
+            return self._cache.get(key)
+        except Exception:
+            # Invalid keys or an unreachable cache: fall through to the database
+            return None
+
+    def _cache_set(self, key, entry, expire_date):
+        if self._cache is None:
+            return
+        try:
+            self._cache.set(key, entry, _l2_timeout(self.get_expiry_age(expiry=expire_date)))
+        except Exception:
+            logger.exception("Error saving session to cache (%s)", self._cache)
+
+    def _cache_delete(self, key):
+        if self._cache is None:
+            return
+        try:
+            self._cache.delete(key)
+        except Exception:
+            # The row is gone; a stale L2 copy lasts at most SESSION_L2_TTL
+            logger.exception("Error deleting session from cache (%s)", self._cache)
+
+    def _is_unchanged(self, data, expire_date):
+        if self._stored is None:
+            return False
+        snapshot, stored_expiry = self._stored
+        coalesce = timedelta(seconds=getattr(settings, 'SESSION_WRITE_COALESCE', 60))
+        return snapshot == self._snapshot(data) and expire_date - stored_expiry < coalesce
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        if not must_create and self._is_unchanged(data, self.get_expiry_date()):
+            return
+        super().save(must_create)
+        # Only cache once the row is written, so the tiers never get ahead of the database
+        obj = self._written
+        key = session_cache_key(obj.session_key)
+        entry = self._remember(key, obj.session_data, obj.expire_date, data)
+        self._cache_set(key, entry, obj.expire_date)
+
+    def create_model_instance(self, data):
+        obj = super().create_model_instance(data)
+        user_id = data.get(SESSION_KEY)
+        obj.user_id = get_user_model()._meta.pk.to_python(user_id) if user_id else None
+        obj.schema_name = getattr(connection, 'schema_name', 'public')
+        self._written = obj
+        return obj
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        key = session_cache_key(session_key)
+        local_sessions.invalidate(key)
+        self._cache_delete(key)
+        self._stored = None
+
+    def flush(self):
+        self.clear()
+        self.delete(self.session_key)
+        self._session_key = None
+
+    # The tiers are synchronous; async callers get the same behaviour off the event loop
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
+
+    async def adelete(self, session_key=None):
+        return await sync_to_async(self.delete)(session_key)
+
+    async def aflush(self):
+        return await sync_to_async(self.flush)()
+
+    @classmethod
+    def clear_expired(cls, batch_size=5000):
+        """ Deletes expired rows in batches; cached copies expire on their own. """
+        model = cls.get_model_class()
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=timezone.now())
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            model.objects.filter(session_key__in=keys).delete()
+
+
+def _revoke(where, params, batch_size=1000):
+    """ Deletes matching sessions in one statement, then evicts them from both cache tiers. """
+    table = connection.ops.quote_name(SessionStore.get_model_class()._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {where} RETURNING session_key, schema_name", params)
+        revoked = cursor.fetchall()
+    keys = [session_cache_key(session_key, schema_name) for session_key, schema_name in revoked]
+    # L2 is shared, so this eviction is seen by every worker (see shared_cache())
+    cache = shared_cache()
+    if cache is not None:
+        try:
+            for start in range(0, len(keys), batch_size):
+                cache.delete_many(keys[start:start + batch_size])
+        except Exception:
+            # The rows are already deleted; stale L2 copies last at most SESSION_L2_TTL
+            logger.exception("Error evicting revoked sessions from cache (%s)", cache)
+    # Other workers' L1 copies expire within SESSION_L1_TTL
+    doomed = set(keys)
+    local_sessions.invalidate_where(lambda key, entry: key in doomed)
+    return len(revoked)
+
+
+def revoke_user_sessions(user_ids):
+    """ Logs the given users out everywhere. Returns the number of sessions removed. """
+    return _revoke("user_id = ANY(%s)", [list(user_ids)])
+
+
+def revoke_tenant_sessions(schema_names):
+    """ Ends every session served by the given tenants (e.g. on suspension). """
+    return _revoke("schema_name = ANY(%s)", [list(schema_names)])
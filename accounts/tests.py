@@ -1,3 +1,128 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import UserSession
+from .sessions import (
+    SessionStore,
+    local_sessions,
+    revoke_tenant_sessions,
+    revoke_user_sessions,
+    session_cache_key,
+    shared_cache,
+)
+
+
+def shared_cache_reachable():
+    cache = shared_cache()
+    if cache is None:
+        return False
+    try:
+        cache.get("accounts.tests:ping")
+    except Exception:
+        return False
+    return True
+
+
+@skipUnless(shared_cache_reachable(), "needs a shared SESSION_CACHE_ALIAS cache (Redis/Memcached)")
+class SessionRevocationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("revoked-user", password="unused")
+        # A second client on the same cache, standing in for another worker
+        self.other_worker = caches.create_connection(settings.SESSION_CACHE_ALIAS)
+
+    def test_revoked_session_is_gone_for_other_workers(self):
+        session = SessionStore()
+        session[SESSION_KEY] = str(self.user.pk)
+        session.save()
+        key = session_cache_key(session.session_key)
+        self.assertIsNotNone(self.other_worker.get(key))
+
+        self.assertEqual(revoke_user_sessions([self.user.pk]), 1)
+
+        self.assertIsNone(self.other_worker.get(key))
+        # The other worker, with nothing in L1, loads through its own client
+        local_sessions.clear()
+        store = SessionStore(session.session_key)
+        store._cache = self.other_worker
+        self.assertEqual(store.load(), {})
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "sessions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "revocation-tests"},
+})
+class BulkRevocationTests(TestCase):
+    """ Runs against the database only; the L2 cache is a locmem stand-in for Redis. """
+
+    def setUp(self):
+        self.alice = User.objects.create_user("alice", password="unused")
+        self.bob = User.objects.create_user("bob", password="unused")
+        self.l2 = caches[settings.SESSION_CACHE_ALIAS]
+        self.l2.clear()
+        local_sessions.clear()
+        self.addCleanup(local_sessions.clear)
+        # locmem is never used as L2 by the engine; hand it to _revoke to see what it evicts
+        patcher = mock.patch("accounts.sessions.shared_cache", return_value=self.l2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sessions = {
+            (user, schema_name): self.make_session(user, schema_name)
+            for user in (self.alice, self.bob, None)
+            for schema_name in ("tenant_a", "tenant_b")
+        }
+
+    def make_session(self, user, schema_name):
+        """ A session row as the engine writes it, cached in both tiers. """
+        data = {SESSION_KEY: str(user.pk)} if user else {}
+        row = UserSession.objects.create(
+            session_key=SessionStore()._get_new_session_key(),
+            session_data=SessionStore().encode(data),
+            expire_date=timezone.now() + timedelta(days=1),
+            user=user,
+            schema_name=schema_name,
+        )
+        key = session_cache_key(row.session_key, schema_name)
+        entry = (row.session_data, row.expire_date)
+        local_sessions.set(key, entry)
+        self.l2.set(key, entry)
+        return key
+
+    def assertRevoked(self, revoked):
+        remaining = {session_cache_key(key, schema) for key, schema in UserSession.objects.values_list(
+            "session_key", "schema_name"
+        )}
+        for owner, key in self.sessions.items():
+            if owner in revoked:
+                self.assertNotIn(key, remaining)
+                self.assertIsNone(self.l2.get(key))
+                self.assertIsNone(local_sessions.get(key))
+            else:
+                self.assertIn(key, remaining)
+                self.assertIsNotNone(self.l2.get(key))
+                self.assertIsNotNone(local_sessions.get(key))
+
+    def test_revoke_user_sessions_across_tenants(self):
+        self.assertEqual(revoke_user_sessions([self.alice.pk]), 2)
+        self.assertRevoked({(self.alice, "tenant_a"), (self.alice, "tenant_b")})
+        self.assertEqual(UserSession.objects.count(), 4)
+
+    def test_revoke_tenant_sessions_for_every_user(self):
+        self.assertEqual(revoke_tenant_sessions(["tenant_b"]), 3)
+        self.assertRevoked({(self.alice, "tenant_b"), (self.bob, "tenant_b"), (None, "tenant_b")})
+        self.assertEqual(UserSession.objects.count(), 3)
+
+    def test_revoking_nobody_deletes_nothing(self):
+        self.assertEqual(revoke_user_sessions([]), 0)
+        self.assertRevoked(set())
+        self.assertEqual(UserSession.objects.count(), 6)
+
+    def test_shared_cache_ignores_locmem(self):
+        # The module's own shared_cache is patched; this name is the real one
+        self.assertIsNone(shared_cache())
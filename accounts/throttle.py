@@ -0,0 +1,149 @@
+"""
+Sliding-window login throttling, checked before authenticate() so rejected
+attempts never reach the (deliberately slow) password hasher.
+
+Each limiter keeps two fixed-window counters in the cache, the current one
+and the previous one, and estimates the sliding count as
+
+    previous * (share of the previous window still inside the sliding window) + current
+
+An attempt is counted with one atomic incr and judged by the count it got
+back, so concurrent attempts each see a distinct count and a parallel burst
+cannot slip past the limit; a rejected attempt is then taken back out.
+
+The counters live in the default cache; for limits that hold across all
+workers that cache must be shared (Redis/Memcached), not the locmem default.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+STATS_PREFIX = "login-throttle:stats"
+
+
+def _incr(key, delta=1, timeout=None):
+    cache.add(key, 0, timeout=timeout)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, delta, timeout=timeout)
+        return delta
+
+
+class SlidingWindowLimiter:
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def _key(self, ident, bucket):
+        return f"login-throttle:{self.scope}:{ident}:{bucket}"
+
+    def _wait(self, current, previous, now):
+        """ Seconds to wait given the counts already in the two windows, or 0. """
+        remaining = 1 - (now % self.window) / self.window
+        if previous * remaining + current < self.limit:
+            return 0
+        if current >= self.limit or not previous:
+            return math.ceil(self.window - now % self.window)
+        # Wait until enough of the previous window has slid out
+        needed = 1 - (self.limit - current) / previous
+        return max(1, math.ceil((needed - (1 - remaining)) * self.window))
+
+    def retry_after(self, ident, now=None):
+        """ Seconds until ident may try again, or 0 if it is under the limit. Read-only. """
+        now = time.time() if now is None else now
+        bucket = int(now // self.window)
+        current_key, previous_key = self._key(ident, bucket), self._key(ident, bucket - 1)
+        counts = cache.get_many([current_key, previous_key])
+        return self._wait(counts.get(current_key, 0), counts.get(previous_key, 0), now)
+
+    def acquire(self, ident, now=None):
+        """
+        Counts an attempt by ident. Returns 0 if it is within the limit,
+        otherwise uncounts it and returns the seconds to wait.
+        """
+        now = time.time() if now is None else now
+        bucket = int(now // self.window)
+        # Kept for two windows so it can serve as the "previous" counter
+        current = _incr(self._key(ident, bucket), timeout=self.window * 2)
+        previous = cache.get(self._key(ident, bucket - 1), 0)
+        # Judge the attempt by the attempts counted before it
+        wait = self._wait(current - 1, previous, now)
+        if wait:
+            self.release(ident, now)
+        return wait
+
+    def release(self, ident, now):
+        """ Takes back an attempt counted by acquire() at the same `now`. """
+        try:
+            cache.decr(self._key(ident, int(now // self.window)))
+        except ValueError:
+            # The counter already expired
+            pass
+
+
+class LoginThrottle:
+    def __init__(self):
+        rates = getattr(settings, 'LOGIN_THROTTLE_RATES', {})
+        ip_limit, ip_window = rates.get('ip', (20, 60))
+        user_limit, user_window = rates.get('username', (10, 300))
+        self.by_ip = SlidingWindowLimiter('ip', ip_limit, ip_window)
+        self.by_username = SlidingWindowLimiter('username', user_limit, user_window)
+
+    @staticmethod
+    def _username_key(username):
+        # Usernames are user input: hash them into a fixed-size, cache-safe key
+        return hashlib.sha256((username or "").strip().lower().encode()).hexdigest()[:32]
+
+    def attempt(self, ip, username):
+        """
+        Records a login attempt. Returns 0 if it may proceed, otherwise the
+        number of seconds to wait; rejected attempts are not counted.
+        """
+        if not getattr(settings, 'LOGIN_THROTTLE_ENABLED', True):
+            return 0
+        ip = ip or "unknown"
+        user_key = self._username_key(username)
+        now = time.time()
+        wait = self.by_ip.acquire(ip, now)
+        if wait:
+            _incr(f"{STATS_PREFIX}:rejected:ip")
+            return wait
+        wait = self.by_username.acquire(user_key, now)
+        if wait:
+            # Rejected attempts are not counted against the IP either
+            self.by_ip.release(ip, now)
+            _incr(f"{STATS_PREFIX}:rejected:username")
+        return wait
+
+    def record_hash(self, elapsed_ns):
+        """ Tracks authenticate() cost so stats() can price the rejected attempts. """
+        _incr(f"{STATS_PREFIX}:hash_count")
+        _incr(f"{STATS_PREFIX}:hash_ns", elapsed_ns)
+
+    def stats(self):
+        keys = ["rejected:ip", "rejected:username", "hash_count", "hash_ns"]
+        values = cache.get_many([f"{STATS_PREFIX}:{key}" for key in keys])
+        values = {key: values.get(f"{STATS_PREFIX}:{key}", 0) for key in keys}
+        rejected = values["rejected:ip"] + values["rejected:username"]
+        mean_hash_ns = values["hash_ns"] / values["hash_count"] if values["hash_count"] else 0
+        return {
+            "rejected_by_ip": values["rejected:ip"],
+            "rejected_by_username": values["rejected:username"],
+            "authenticate_calls": values["hash_count"],
+            "mean_authenticate_ms": mean_hash_ns / 1e6,
+            "cpu_seconds_avoided": rejected * mean_hash_ns / 1e9,
+        }
+
+    def reset_stats(self):
+        cache.delete_many([
+            f"{STATS_PREFIX}:{key}" for key in ("rejected:ip", "rejected:username", "hash_count", "hash_ns")
+        ])
+
+
+login_throttle = LoginThrottle()
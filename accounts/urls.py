@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
 
+# Under ASGI the async views keep password hashing off the event loop
+if getattr(settings, 'ACCOUNTS_ASYNC_AUTH_VIEWS', False):
+    login_view, signup_view = views.async_login_view, views.async_signup_view
+else:
+    login_view, signup_view = views.login_view, views.signup_view
+
 urlpatterns = [
-    path('login/', views.login_view, name='login'),
-    path('signup/', views.signup_view, name='signup'),
+    path('login/', login_view, name='login'),
+    path('signup/', signup_view, name='signup'),
     path('forgot-passowrd/', views.forgot_password_view, name='forgot_password'),
 
     #Django built-ins for password reset
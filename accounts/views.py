@@ -7,9 +7,18 @@ from django.contrib.auth.forms import PasswordResetForm
 from django.core.mail import send_mail
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404
-from .models import LoginSession, TwoFactorCode
+from .models import LoginSession
+from .otp import get_otp_store
+from .audit import login_audit
+from .pagination import keyset_page
+from .sessions import revoke_user_sessions
 from django.conf import settings
 from .signals import get_client_ip
+from .throttle import login_throttle
+from .hashing import aauthenticate_user, amake_password
+from core_app.benchmarks import timed
+from asgiref.sync import sync_to_async
+import time
 
 # Create your views here.
 
@@ -17,11 +26,18 @@ def login_view(request):
     if request.method == 'POST':
         username = request.POST['username']
         password = request.POST['password']
-        user = authenticate(request, username=username, password=password)
+        # Throttle before authenticate(): the password hash is the expensive part
+        retry_after = login_throttle.attempt(get_client_ip(request), username)
+        if retry_after:
+            messages.error(request, 'Too many login attempts. Please try again later.')
+            response = render(request, 'accounts/login.html', status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+        user, elapsed = timed(authenticate, request, username=username, password=password)
+        login_throttle.record_hash(elapsed)
         if user is not None:
             ##Code for generating and sending 6-digits 2FA code ##
-            code = TwoFactorCode.generate_code()
-            TwoFactorCode.objects.create(user=user, code=code)
+            code = get_otp_store().issue(user.id)
             send_mail(
                 'Your 2FA code',
                 f'Your one-time login code is: {code}',
@@ -30,9 +46,8 @@ def login_view(request):
                 fail_silently=False,
             )
             ##login(request, user) -- for normal login without 2FA
+            # Saved by SessionMiddleware with the response
             request.session['pending_user'] = user.id
-            request.session.modified = True
-            request.session.save()
 
             print("Debug: pending_user set -> ", request.session['pending_user'])
 
@@ -42,6 +57,35 @@ def login_view(request):
             messages.error(request, 'Invalid username or password.')
     return render(request, 'accounts/login.html')
 
+async def async_login_view(request):
+    """ login_view for ASGI: hashing runs in accounts.hashing's pool, not on the event loop. """
+    if request.method == 'POST':
+        username = request.POST['username']
+        password = request.POST['password']
+        retry_after = await sync_to_async(login_throttle.attempt)(get_client_ip(request), username)
+        if retry_after:
+            messages.error(request, 'Too many login attempts. Please try again later.')
+            response = render(request, 'accounts/login.html', status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+        start = time.perf_counter_ns()
+        user = await aauthenticate_user(request, username, password)
+        await sync_to_async(login_throttle.record_hash)(time.perf_counter_ns() - start)
+        if user is not None:
+            code = await sync_to_async(get_otp_store().issue)(user.id)
+            await sync_to_async(send_mail)(
+                'Your 2FA code',
+                f'Your one-time login code is: {code}',
+                settings.DEFAULT_FROM_EMAIL,
+                [user.email],
+                fail_silently=False,
+            )
+            await request.session.aset('pending_user', user.id)
+            return redirect('verify_2fa')
+        else:
+            messages.error(request, 'Invalid username or password.')
+    return render(request, 'accounts/login.html')
+
 def signup_view(request):
     if request.method == 'POST':
         username = request.POST['username']
@@ -52,6 +96,19 @@ def signup_view(request):
         return redirect('/login/')
     return render(request, 'accounts/signup.html')
 
+async def async_signup_view(request):
+    if request.method == 'POST':
+        username = request.POST['username']
+        password = request.POST['password']
+        email = request.POST['email']
+        # Same as User.objects.create_user(), with the hash computed off the event loop
+        user = User(username=User.normalize_username(username), email=User.objects.normalize_email(email))
+        user.password = await amake_password(password)
+        await user.asave()
+        messages.success(request, 'Account created successfully.')
+        return redirect('/login/')
+    return render(request, 'accounts/signup.html')
+
 def forgot_password_view(request):
     if request.method == 'POST':
         email = request.POST['email']
@@ -68,8 +125,12 @@ def forgot_password_view(request):
 
 @login_required
 def session_logs_view(request):
-    sessions = LoginSession.objects.filter(user=request.user).order_by('-login_time')
-    return render(request, 'accounts/session_logs.html', {'sessions': sessions})
+    sessions, next_cursor = keyset_page(
+        LoginSession.objects.filter(user=request.user),
+        request.GET.get('cursor'),
+        getattr(settings, 'SESSION_LOGS_PAGE_SIZE', 50),
+    )
+    return render(request, 'accounts/session_logs.html', {'sessions': sessions, 'next_cursor': next_cursor})
 
 def verify_2fa_view(request):
     if 'pending_user' not in request.session:
@@ -80,16 +141,9 @@ def verify_2fa_view(request):
 
     if request.method =='POST':
         code = request.POST['code']
-        valid = TwoFactorCode.objects.filter(user=user, code=code, is_used=False).last()
-        if valid and valid.is_valid():
-            valid.is_used = True
-            valid.save()
+        if get_otp_store().verify(user.id, code):
+            # The user_logged_in receiver records the LoginSession
             login(request, user)
-            LoginSession.objects.create(
-                user=user, 
-                ip_address=get_client_ip(request), 
-                user_agent=request.META.get('HTTP_USER_AGENT', 'unknown')
-            )
             del request.session['pending_user']
             return redirect('/admin/') ##or tenant dashboard
         else:
@@ -98,21 +152,15 @@ def verify_2fa_view(request):
 
 @login_required
 def logout_view(request):
-    current_key = request.session.session_key
-    if current_key:
-        LoginSession.objects.filter(
-            user=request.user,
-            session_key=current_key, 
-            is_active=True
-        ).update(is_active=False, logout_time=timezone.now())
+    # The user_logged_out receiver closes the LoginSession
     logout(request)
     return redirect('/login/')
 
 @login_required
 def logout_all_devices_view(request):
-    LoginSession.objects.filter(user=request.user, is_active=True).update(
-        is_active=False, logout_time=timezone.now()
-    )
+    login_audit.record_logout_all(request.user.pk)
+    # Deletes every session of the user, including this one, in one statement
+    revoke_user_sessions([request.user.pk])
     logout(request)
     return redirect('/login/')
 
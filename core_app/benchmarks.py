@@ -0,0 +1,33 @@
+"""
+Small helpers shared by the ``bench_*`` management commands.
+"""
+import time
+
+
+def percentile(samples, pct):
+    """ Nearest-rank percentile of an already sorted list. """
+    if not samples:
+        return 0
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+def format_latency(label, samples_ns):
+    """ Returns a one-line p50/p99/mean summary for a list of nanosecond timings. """
+    samples = sorted(samples_ns)
+    if not samples:
+        return f"{label}: no samples"
+    mean = sum(samples) / len(samples)
+    return (
+        f"{label}: n={len(samples)} "
+        f"p50={percentile(samples, 50) / 1000:.1f}us "
+        f"p99={percentile(samples, 99) / 1000:.1f}us "
+        f"mean={mean / 1000:.1f}us"
+    )
+
+
+def timed(func, *args, **kwargs):
+    """ Calls func and returns (result, elapsed nanoseconds). """
+    start = time.perf_counter_ns()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter_ns() - start
@@ -0,0 +1,37 @@
+import json
+import os
+
+
+class Checkpoint:
+    """
+    JSON progress file for long-running commands that must survive a crash.
+    Writes go to a temp file and are renamed into place, so a kill mid-write
+    never leaves a truncated checkpoint behind.
+    """
+
+    def __init__(self, path, data=None):
+        self.path = path
+        self.data = data if data is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path) as f:
+                return cls(path, json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path)
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.data = {}
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
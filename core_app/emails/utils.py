@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 
+PLAIN_TEXT_BODY = 'This is an HTML email. Please view it in an HTML-compatible email viewer.'
+
 def send_html_email(subject, to_email, template_name, context):
     """
     Sends an HTML email to the specified recipient.
 
+    With EMAIL_OUTBOX_ENABLED (the default) the message is only queued in the
+    mailer outbox and delivered by `manage.py send_queued_email`, so callers
+    never wait on SMTP.
+
     param subject: Subject of the email
     param to_email: Recipient's email address
     param template_name: Name of the HTML template to render
@@ -13,10 +20,14 @@ def send_html_email(subject, to_email, template_name, context):
     # Render the HTML content using the provided template and context
     html_content = render_to_string(template_name, context)
 
+    if getattr(settings, 'EMAIL_OUTBOX_ENABLED', True):
+        from mailer.sender import enqueue_email
+        return enqueue_email(subject, [to_email], PLAIN_TEXT_BODY, html_body=html_content)
+
     # Create the email message
     email = EmailMultiAlternatives(
         subject=subject,
-        body='This is an HTML email. Please view it in an HTML-compatible email viewer.',
+        body=PLAIN_TEXT_BODY,
         to=[to_email]
     )
 
@@ -24,4 +35,4 @@ def send_html_email(subject, to_email, template_name, context):
     email.attach_alternative(html_content, "text/html")
 
     # Send the email
-    email.send()
\ No newline at end of file
+    email.send()
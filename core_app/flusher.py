@@ -0,0 +1,108 @@
+import atexit
+import logging
+import os
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Base for per-worker write-behind buffers: request code adds to an
+    in-memory buffer and a background thread writes it out in batches,
+    every `interval` seconds or as soon as `max_pending` items are waiting.
+
+    Subclasses hold their state under self.lock, call self.added(size) after
+    adding, and implement take() (swap out and return everything pending)
+    and write(pending). With enabled=False every add is written inline.
+    A failed write is handed back to requeue() and retried with the next
+    flush, up to max_retries times in a row before the batch is dropped.
+    """
+    thread_name = "write-behind"
+    max_retries = 3
+
+    def __init__(self, interval=2, max_pending=500, enabled=True):
+        self.interval = interval
+        self.max_pending = max_pending
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        self._failures = 0
+
+    def take(self):
+        raise NotImplementedError
+
+    def write(self, pending):
+        raise NotImplementedError
+
+    def requeue(self, pending):
+        """ Merges a batch whose write() failed back into the buffer (called under self.lock). """
+
+    def reset(self):
+        """ Drops state inherited from the parent process after a fork. """
+        self.take()
+
+    def added(self, size):
+        if not self.enabled:
+            self.flush()
+            return
+        self.ensure_started()
+        if size >= self.max_pending:
+            self._wake.set()
+
+    def flush(self):
+        # Serialised so a flush triggered at exit cannot interleave with the thread's
+        with self._flush_lock:
+            with self.lock:
+                pending = self.take()
+            if not pending:
+                return
+            try:
+                self.write(pending)
+            except Exception:
+                self._failures += 1
+                if self._failures <= self.max_retries:
+                    with self.lock:
+                        self.requeue(pending)
+                else:
+                    # Keep one bad batch from blocking everything behind it
+                    self._failures = 0
+                    logger.error("%s dropped a batch after %s failed writes.", self.thread_name, self.max_retries + 1)
+                raise
+            self._failures = 0
+
+    def ensure_started(self):
+        """ Starts the flush thread once per process (workers may be forked after import). """
+        if self._pid == os.getpid():
+            return
+        with self.lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self.reset()
+            else:
+                atexit.register(self._flush_at_exit)
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name=self.thread_name, daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("%s flush failed.", self.thread_name)
+
+    def _flush_at_exit(self):
+        if self._pid != os.getpid():
+            return
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("%s flush at exit failed.", self.thread_name)
@@ -0,0 +1,126 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils.asyncio import async_unsafe
+from django_tenants.postgresql_backend.base import DatabaseWrapper as TenantDatabaseWrapper
+
+
+class SearchPathCursor:
+    """
+    Cursor proxy used behind a transaction-pooling proxy (PgBouncer in
+    transaction mode). Session state does not survive between transactions
+    there, so `SET LOCAL search_path` is sent in the same simple-query message
+    as every statement, which Postgres runs as one implicit transaction on one
+    server connection.
+
+    psycopg2 reports the last result of such a string, psycopg 3 the first
+    (the SET's), so with psycopg 3 the cursor is moved on to the statement's
+    own result. psycopg 3 only sends several statements at once with
+    client-side binding, Django's default; server_side_binding is refused.
+    """
+
+    def __init__(self, cursor, db):
+        self._cursor = cursor
+        self._db = db
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+
+    def execute(self, sql, params=None):
+        result = self._cursor.execute(self._db.search_path_prefix() + sql, params)
+        if is_psycopg3:
+            self._cursor.nextset()
+        return result
+
+    def executemany(self, sql, param_list):
+        if is_psycopg3:
+            # Each execution has to carry its own SET, and skip past its result
+            for params in param_list:
+                self.execute(sql, params)
+            return None
+        return self._cursor.executemany(self._db.search_path_prefix() + sql, param_list)
+
+
+class DatabaseWrapper(TenantDatabaseWrapper):
+    """
+    django_tenants backend for persistent (CONN_MAX_AGE) connections.
+
+    The stock backend forgets the search_path whenever a tenant is set, so a
+    reused connection still pays one `SET search_path` per request. This one
+    remembers what the physical connection is on and only issues SET when the
+    schema actually changes.
+
+    With TRANSACTION_POOLING in the database settings the server connection can
+    change between transactions, so nothing is cached and the search_path is
+    inlined into every statement instead (see SearchPathCursor).
+    """
+
+    def __init__(self, *args, **kwargs):
+        # search_path the physical connection is currently on
+        self.connection_search_path = None
+        # number of `SET search_path` round trips, for benchmarks
+        self.search_path_statements = 0
+        self._search_path_prefix = (None, '')
+        super().__init__(*args, **kwargs)
+
+    @property
+    def transaction_pooling(self):
+        return self.settings_dict.get('TRANSACTION_POOLING', False)
+
+    def search_path_prefix(self):
+        key = (self.schema_name, self.include_public_schema)
+        if self._search_path_prefix[0] != key:
+            search_paths = ','.join("'{}'".format(s) for s in self._get_cursor_search_paths())
+            self._search_path_prefix = (key, 'SET LOCAL search_path = {0}; '.format(search_paths))
+        return self._search_path_prefix[1]
+
+    def create_cursor(self, name=None):
+        cursor = super().create_cursor(name)
+        if self.transaction_pooling and not name:
+            if is_psycopg3 and self.settings_dict['OPTIONS'].get('server_side_binding'):
+                raise ImproperlyConfigured(
+                    "TRANSACTION_POOLING sends `SET LOCAL search_path` and the statement together, "
+                    "which psycopg 3 only allows with client-side binding; unset server_side_binding."
+                )
+            return SearchPathCursor(cursor, self)
+        return cursor
+
+    def _handle_search_path(self, cursor=None):
+        if self._setting_search_path or self.transaction_pooling:
+            return
+
+        if self.schema_name and self.connection_search_path == self._get_cursor_search_paths():
+            self.search_path_set_schemas = self.connection_search_path
+            return
+
+        # Force the SET even with TENANT_LIMIT_SET_CALLS: the connection is known to be elsewhere
+        self.search_path_set_schemas = None
+        super()._handle_search_path(cursor)
+        self.connection_search_path = self.search_path_set_schemas
+        if self.search_path_set_schemas is not None:
+            self.search_path_statements += 1
+
+    def close(self):
+        self.connection_search_path = None
+        super().close()
+
+    @async_unsafe
+    def rollback(self):
+        # SET is transactional, a rollback may have undone it
+        self.connection_search_path = None
+        super().rollback()
+
+    @async_unsafe
+    def savepoint_rollback(self, sid):
+        try:
+            super().savepoint_rollback(sid)
+        finally:
+            self.connection_search_path = None
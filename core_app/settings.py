@@ -18,6 +18,9 @@ import environ, os
 BASE_DIR = Path(__file__).resolve().parent.parent
 #load_dotenv()
 
+env = environ.Env()
+environ.Env.read_env(os.path.join(BASE_DIR, '.env'))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -37,6 +40,7 @@ SHARED_APPS = [
     "django_tenants",  # mandatory
     "customers",  # you must list the app where your tenant model resides in
     "accounts",
+    "mailer",
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -61,7 +65,72 @@ INSTALLED_APPS = SHARED_APPS + TENANT_APPS
 TENANT_MODEL = "customers.Client"  # app.Model
 TENANT_DOMAIN_MODEL = "customers.Domain"
 
-SESSION_ENGINE = "django.contrib.sessions.backends.db"
+# New tenants are cloned from this pre-migrated schema (see `manage.py prepare_tenant_template`)
+# instead of replaying every migration. Without the template schema, creation falls back to migrating.
+TENANT_BASE_SCHEMA = env("TENANT_BASE_SCHEMA", default="tenant_template")
+TENANT_CREATION_FAKES_MIGRATIONS = True
+# Also copy the template's rows (seed data) into new tenants
+TENANT_TEMPLATE_CLONE_DATA = env.bool("TENANT_TEMPLATE_CLONE_DATA", default=False)
+
+# Caches. Session L2 has to be shared by every worker: set SESSION_CACHE_URL to Redis
+# (e.g. redis://127.0.0.1:6379/1, needs the `redis` package) or Memcached. The locmem
+# default is not shared, so accounts.sessions skips L2 and reads sessions from the database
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    "sessions": env.cache("SESSION_CACHE_URL", default="locmemcache://sessions"),
+}
+
+# Tiered sessions: per-process L1 -> shared cache L2 -> database (accounts.sessions)
+SESSION_ENGINE = "accounts.sessions"
+SESSION_CACHE_ALIAS = "sessions"
+SESSION_L1_TTL = 2  # seconds
+SESSION_L1_MAX_SIZE = 10000
+# Upper bound on how long L2 holds a session, whatever its expiry
+SESSION_L2_TTL = 300  # seconds
+# Saves that change nothing but push the expiry forward by less than this are skipped
+SESSION_WRITE_COALESCE = 60  # seconds
+
+# Per-worker hostname -> tenant cache used by customers.middleware.CachedTenantMiddleware
+TENANT_CACHE_MAX_SIZE = 20000
+TENANT_CACHE_TTL = 60  # seconds
+
+# Suspended/Cancelled tenants are pushed to every worker over Postgres LISTEN/NOTIFY
+TENANT_STATUS_CHANNEL = "tenant_status"
+TENANT_STATUS_LISTEN = True
+
+# Signup availability checks (customers.reservations): only "taken" answers are cached,
+# since a free name can be claimed in another worker at any moment
+DOMAIN_TAKEN_CACHE_TTL = 300  # seconds
+
+# 2FA codes (accounts.otp). CacheOTPStore needs a cache shared by all workers.
+OTP_STORE = env("OTP_STORE", default="accounts.otp.DBOTPStore")
+OTP_TTL = 600  # seconds
+OTP_MAX_ATTEMPTS = 5
+
+# Login attempts allowed per sliding window: (attempts, window seconds), see accounts.throttle
+LOGIN_THROTTLE_ENABLED = env.bool("LOGIN_THROTTLE_ENABLED", default=True)
+LOGIN_THROTTLE_RATES = {
+    "ip": (20, 60),
+    "username": (10, 300),
+}
+
+# Serve the async login/signup views (for ASGI deployments) and size their hashing pool
+ACCOUNTS_ASYNC_AUTH_VIEWS = env.bool("ACCOUNTS_ASYNC_AUTH_VIEWS", default=False)
+PASSWORD_HASH_WORKERS = env.int("PASSWORD_HASH_WORKERS", default=os.cpu_count() or 1)
+
+# LoginSession audit rows are buffered per worker and bulk-written (accounts.audit)
+LOGIN_AUDIT_BUFFERED = env.bool("LOGIN_AUDIT_BUFFERED", default=True)
+LOGIN_AUDIT_FLUSH_INTERVAL = 2  # seconds
+LOGIN_AUDIT_MAX_PENDING = 500
+# How long a logout waits for a login still buffered in another worker
+LOGIN_AUDIT_LOGOUT_GRACE = 600  # seconds
+SESSION_LOGS_PAGE_SIZE = 50
+
+# LoginSession is range-partitioned by month (accounts.partitions); months past the
+# retention period are exported to gzip CSV here and dropped from the database
+LOGIN_SESSION_PARTITIONS_AHEAD = 3
+LOGIN_SESSION_RETENTION_MONTHS = 12
+LOGIN_SESSION_ARCHIVE_DIR = env("LOGIN_SESSION_ARCHIVE_DIR", default=str(BASE_DIR / "archive" / "login_sessions"))
 
 
 DATABASE_ROUTERS = (
@@ -69,7 +138,8 @@ DATABASE_ROUTERS = (
 )
 
 MIDDLEWARE = [
-    "django_tenants.middleware.TenantMiddleware",
+    "customers.middleware.CachedTenantMiddleware",
+    "customers.middleware.VisitorSketchMiddleware",
     "core_app.middleware.BlockTenantAdminMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -105,17 +175,24 @@ WSGI_APPLICATION = "core_app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-env = environ.Env()
-environ.Env.read_env(os.path.join(BASE_DIR, '.env'))
+# Set DB_TRANSACTION_POOLING when DB_HOST is a PgBouncer-style proxy in transaction mode
+DB_TRANSACTION_POOLING = env.bool('DB_TRANSACTION_POOLING', default=False)
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django_tenants.postgresql_backend',
+        # django_tenants backend that skips redundant `SET search_path` on reused connections
+        'ENGINE': 'core_app.postgresql_backend',
         'NAME': env('DB_NAME'),
         'USER': env('DB_USER'),
         'PASSWORD': env('DB_PASSWORD'),
         'HOST': env('DB_HOST'),
         'PORT': env('DB_PORT'),
+        # Keep TLS connections open across requests instead of reconnecting every time
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=600),
+        'CONN_HEALTH_CHECKS': True,
+        'TRANSACTION_POOLING': DB_TRANSACTION_POOLING,
+        # Named cursors are session state and break behind a transaction pooler
+        'DISABLE_SERVER_SIDE_CURSORS': DB_TRANSACTION_POOLING,
         'OPTIONS': {
             'sslmode': 'require',
         }
@@ -175,6 +252,49 @@ CRONJOBS += [
     ('0 3 * * 0', 'scripts.weekly_full_backup.sh'),  # Runs Sunday 3 AM
 ]
 
+CRONJOBS += [
+    # Drains tenant provisioning jobs when no long-running workers are deployed
+    ('* * * * *', 'django.core.management.call_command', ['run_provisioning_workers', '--once', '--workers=2']),
+]
+
+PROVISIONING_MAX_ATTEMPTS = 5
+
+# Client usage counters: per-worker deltas applied in one UPDATE per flush (customers.usage)
+USAGE_COUNTERS_BUFFERED = env.bool("USAGE_COUNTERS_BUFFERED", default=True)
+USAGE_COUNTERS_FLUSH_INTERVAL = 5  # seconds
+USAGE_COUNTERS_MAX_PENDING = 1000
+
+# Unique visitors: per-tenant daily HyperLogLog sketches (customers.visitors)
+VISITOR_SKETCH_BUFFERED = env.bool("VISITOR_SKETCH_BUFFERED", default=True)
+VISITOR_SKETCH_FLUSH_INTERVAL = 60  # seconds
+VISITOR_SKETCH_MAX_PENDING = 1000
+
+# Cross-tenant reports (customers.fanout): each worker holds one DB connection,
+# so keep workers well under the server's max_connections
+TENANT_FANOUT_WORKERS = env.int("TENANT_FANOUT_WORKERS", default=8)
+TENANT_FANOUT_TIMEOUT = 30  # seconds per statement, per tenant
+
+CRONJOBS += [
+    ('0 9 * * *', 'django.core.management.call_command', ['send_payment_reminders']),  # Daily 9 AM
+    ('* * * * *', 'django.core.management.call_command', ['send_login_notifications']),
+    ('30 3 * * *', 'django.core.management.call_command', ['purge_2fa_codes']),
+    ('15 2 * * *', 'django.core.management.call_command', ['manage_login_partitions']),
+    ('0 4 * * *', 'django.core.management.call_command', ['clearsessions']),
+    ('30 4 * * *', 'django.core.management.call_command', ['reconcile_usage_counters']),
+    ('5 * * * *', 'django.core.management.call_command', ['refresh_visitor_counts']),
+    ('45 * * * *', 'django.core.management.call_command', ['scan_storage_usage']),
+    # Files rewritten in place do not change their directory's mtime; re-measure everything nightly
+    ('20 4 * * *', 'django.core.management.call_command', ['scan_storage_usage', '--full']),
+    ('*/15 * * * *', 'django.core.management.call_command', ['refresh_revenue_rollups']),
+    # Off the quarter hours, so it rarely waits on the incremental run's locks
+    ('50 3 * * *', 'django.core.management.call_command', ['refresh_revenue_rollups', '--full']),
+]
+
+CRONJOBS += [
+    # Drains the email outbox when no long-running sender is deployed
+    ('* * * * *', 'django.core.management.call_command', ['send_queued_email', '--once']),
+]
+
 # ----------------------------
 # Email / SMTP Configuration
 # ----------------------------
@@ -189,3 +309,7 @@ EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", default=None)
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default=EMAIL_HOST_USER)
 
 
+
+# Queue email in the mailer outbox instead of sending on the request path
+EMAIL_OUTBOX_ENABLED = env.bool("EMAIL_OUTBOX_ENABLED", default=True)
+EMAIL_OUTBOX_MAX_ATTEMPTS = 6
@@ -1,10 +1,11 @@
 from django.contrib import admin
 from django_tenants.admin import TenantAdminMixin
-from .models import Client, Domain, TenantRequest
+from .models import Client, Domain, ProvisioningJob, SpareSchema, TenantRequest
 from datetime import date
-from django.db import connection, transaction
-from django_tenants.utils import schema_context
-from core_app.emails.utils import send_html_email
+from django.utils import timezone
+from .provisioning import bulk_approve, enqueue_provisioning
+from .status_gate import notify_status_change
+from accounts.sessions import revoke_tenant_sessions
 
 
 @admin.register(Domain)
@@ -65,13 +66,21 @@ class ClientAdmin(TenantAdminMixin, admin.ModelAdmin):
 
     # Custom action to suspend a tenant
     def suspend_tenants(self, request, queryset):
+        schemas = list(queryset.values_list('schema_name', flat=True))
         updated = queryset.update(status='Suspended')
-        self.message_user(request, f"{updated} tenant(s) successfully suspended and access disabled.")
+        # update() skips post_save, so tell the workers' status gates directly
+        notify_status_change((schema, 'Suspended') for schema in schemas)
+        revoked = revoke_tenant_sessions(schemas)
+        self.message_user(
+            request, f"{updated} tenant(s) successfully suspended and access disabled ({revoked} session(s) ended)."
+        )
     suspend_tenants.short_description = "Suspend selected tenants"
 
     # Custom action to activate a tenant
     def activate_tenants(self, request, queryset):
+        schemas = list(queryset.values_list('schema_name', flat=True))
         updated = queryset.update(status='Active')
+        notify_status_change((schema, 'Active') for schema in schemas)
         self.message_user(request, f"{updated} tenant(s) successfully activated.")
     activate_tenants.short_description = "Activate selected tenants"
 
@@ -103,72 +112,54 @@ class ClientAdmin(TenantAdminMixin, admin.ModelAdmin):
         'total_orders_value', 'last_payment_date'
     )
 
+@admin.register(SpareSchema)
+class SpareSchemaAdmin(admin.ModelAdmin):
+    list_display = ('schema_name', 'created_on')
+
 @admin.register(TenantRequest)
 class TenantRequestAdmin(admin.ModelAdmin):
-    list_display = ('tenant_name', 'desired_domain', 'is_approved', 'requested_on')
-    list_filter = ('status',)
-    actions = ['approve_selected_tenants']
+    list_display = ('tenant_name', 'desired_domain', 'is_approved', 'requested_on', 'provisioning_status')
+    list_filter = ('status', 'provisioning_job__status')
+    list_select_related = ('provisioning_job',)
+    actions = ['approve_selected_tenants', 'bulk_approve_selected_tenants']
     #print("🔍 TenantRequestAdmin loaded successfully")
 
     @admin.action(description='Approve selected tenants')
     def approve_selected_tenants(self, request, queryset):
-        try:
-            print("🚀 ACTION EXECUTED >>>", queryset)
-            connection.set_autocommit(True)
-    
-            with schema_context('public'):
-                for tenant_request in queryset.filter(is_approved=False):
-                    schema_name = tenant_request.tenant_name.lower().replace(" ", "_")
-    
-                    tenant_request.is_approved = True
-                    tenant_request.status = "Approved"
-                    tenant_request.save()
-    
-                    tenant = Client(
-                        schema_name=schema_name,
-                        tenant_name=tenant_request.tenant_name,
-                        server_name="VPS-001",
-                        desired_domain=tenant_request.desired_domain,
-                        plan_type=tenant_request.plan_type,
-                        payment_mode=tenant_request.payment_mode,
-                        email=tenant_request.email,
-                        company=tenant_request.company,
-                        address=tenant_request.address,
-                        logo=tenant_request.logo
-                    )
-                    tenant.save()  # just saves metadata first
-    
-                    print(f"⚙️ Creating schema manually for: {schema_name}")
-                    tenant.create_schema(check_if_exists=True)  # ✅ force schema creation
-    
-                    Domain.objects.create(
-                        domain=f"{tenant_request.desired_domain}.localhost",
-                        tenant=tenant,
-                        is_primary=True
-                    )
-    
-                    print(f"✅ Tenant {schema_name} schema created successfully.")
-                    
-                    send_html_email(
-                        subject="Your Tenant has been successfully created",
-                        to_email=tenant_request.email,
-                        template_name="emails/tenant_created.html",
-                        context={
-                            "owner_name": tenant_request.tenant_name,
-                            "tenant_name": tenant_request.tenant_name,
-                            "company": tenant_request.company,
-                            "email": tenant_request.email,
-                            "address": tenant_request.address,
-                            #"created_on": tenant_created_on,
-                            "domain": tenant_request.desired_domain
-                        }
-                    )       
-                    print(f" email sent to {tenant_request.email}")
-    
-            connection.set_autocommit(False)
-            self.message_user(request, "✅ Tenants approved and schemas created successfully.")
+        # Schemas, domains and emails are built by `manage.py run_provisioning_workers`
+        queued = enqueue_provisioning(queryset.filter(is_approved=False))
+        self.message_user(request, f"✅ {queued} tenant(s) queued for provisioning.")
+
+    @admin.action(description='Bulk approve selected tenants (large batches)')
+    def bulk_approve_selected_tenants(self, request, queryset):
+        approved, rejected = bulk_approve(queryset.filter(is_approved=False))
+        self.message_user(request, f"✅ {len(approved)} tenant(s) approved, schemas queued for provisioning.")
+        if rejected:
+            names = dict(queryset.filter(pk__in=rejected).values_list('pk', 'tenant_name'))
+            details = "; ".join(f"{names.get(pk, pk)}: {reason}" for pk, reason in list(rejected.items())[:20])
+            self.message_user(request, f"❌ {len(rejected)} request(s) skipped — {details}", level='warning')
+
+    @admin.display(description='Provisioning')
+    def provisioning_status(self, obj):
+        job = getattr(obj, 'provisioning_job', None)
+        if job is None:
+            return "—"
+        if job.status in ('Queued', 'Failed') and job.attempts:
+            return f"{job.status} (attempt {job.attempts})"
+        return job.status
 
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            self.message_user(request, f"❌ Error approving tenants: {e}", level='error')
\ No newline at end of file
+
+@admin.register(ProvisioningJob)
+class ProvisioningJobAdmin(admin.ModelAdmin):
+    list_display = ('tenant_request', 'status', 'attempts', 'email_sent', 'run_after', 'updated_on')
+    list_filter = ('status',)
+    list_select_related = ('tenant_request',)
+    readonly_fields = ('tenant_request', 'attempts', 'last_error', 'email_sent', 'created_on', 'updated_on')
+    actions = ['retry_jobs']
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status__in=('Running', 'Succeeded')).update(
+            status='Queued', attempts=0, run_after=timezone.now()
+        )
+        self.message_user(request, f"{updated} job(s) re-queued.")
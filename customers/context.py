@@ -0,0 +1,80 @@
+from django_tenants.utils import get_tenant_domain_model
+
+
+class TenantContext:
+    """
+    Immutable, slotted stand-in for a Client row on the request path.
+
+    Only the columns routing needs are loaded. Anything else (usage counters,
+    billing fields, logo, ...) is read from the full Client. Contexts live in
+    the shared tenant cache, so the full row is never kept on them: a request
+    works on its own copy (for_request()), which loads the row at most once
+    and is dropped with the request. Without a copy every access is a fresh
+    lookup.
+    """
+
+    __slots__ = ('pk', 'schema_name', 'status', 'plan_id', 'plan_type', 'domain_url', '_memo')
+
+    # Client columns fetched when resolving a hostname, in constructor order
+    FIELDS = ('id', 'schema_name', 'status', 'plan_id', 'plan_type')
+
+    def __init__(self, pk, schema_name, status, plan_id=None, plan_type=None, domain_url=None):
+        for name, value in (
+            ('pk', pk),
+            ('schema_name', schema_name),
+            ('status', status),
+            ('plan_id', plan_id),
+            ('plan_type', plan_type),
+            ('domain_url', domain_url),
+            ('_memo', None),
+        ):
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def for_hostname(cls, hostname):
+        """ Builds the context for hostname; raises Domain.DoesNotExist if unknown. """
+        row = get_tenant_domain_model().objects.filter(domain=hostname).values_list(
+            *(f'tenant__{field}' for field in cls.FIELDS)
+        ).get()
+        return cls(*row, domain_url=hostname)
+
+    def for_request(self):
+        """ A copy for one request, which may keep the full Client row until the request ends. """
+        copy = self.__class__(self.pk, self.schema_name, self.status, self.plan_id, self.plan_type, self.domain_url)
+        object.__setattr__(copy, '_memo', {})
+        return copy
+
+    @property
+    def id(self):
+        return self.pk
+
+    @property
+    def client(self):
+        """ The full Client row: loaded once per request copy, fresh every time otherwise. """
+        from .models import Client
+        if self._memo is None:
+            return Client.objects.get(pk=self.pk)
+        if 'client' not in self._memo:
+            self._memo['client'] = Client.objects.get(pk=self.pk)
+        return self._memo['client']
+
+    def __getattr__(self, name):
+        # Only called for names that are not slots: fall back to the full model
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"TenantContext is immutable (tried to set '{name}').")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"TenantContext is immutable (tried to delete '{name}').")
+
+    def __reduce__(self):
+        return (self.__class__, (self.pk, self.schema_name, self.status, self.plan_id, self.plan_type, self.domain_url))
+
+    def __str__(self):
+        return self.schema_name
+
+    def __repr__(self):
+        return f"<TenantContext {self.schema_name} ({self.status})>"
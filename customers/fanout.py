@@ -0,0 +1,159 @@
+"""
+Runs the same query against many tenant schemas at once.
+
+Looping over schema_context() visits one schema at a time on one connection,
+so a report over thousands of tenants is bound by round trips, not by the
+database. fan_out() hands the schemas to a fixed set of worker threads. Each
+thread holds its own connection (Django connections are per thread), so the
+pool size is also the number of connections used. Every tenant runs in its
+own transaction with a statement_timeout. A slow or broken schema only fails
+its own TenantResult and the rest of the run carries on. Results are yielded
+as tenants finish. reduce_tenants() folds them into one value and collects
+the failures.
+
+Only statements are cut off by the timeout; Python work inside a callable
+runs to completion.
+"""
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from .models import Client
+
+# Postgres "query_canceled", raised when statement_timeout fires
+QUERY_CANCELED = '57014'
+
+
+class TenantResult(namedtuple('TenantResult', 'schema_name value error elapsed')):
+    """ One schema's outcome: value on success, otherwise an error string. """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def timed_out(self):
+        return self.error == 'timeout'
+
+
+def tenant_schemas():
+    """ Every tenant schema, public excluded. """
+    return list(
+        Client.objects.exclude(schema_name=get_public_schema_name())
+        .order_by('schema_name')
+        .values_list('schema_name', flat=True)
+    )
+
+
+def _run_sql(sql, params):
+    def run(schema_name, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else cursor.rowcount
+    return run
+
+
+def _describe(exc):
+    cause = exc.__cause__ or exc
+    code = getattr(cause, 'pgcode', None) or getattr(cause, 'sqlstate', None)
+    if code == QUERY_CANCELED:
+        return 'timeout'
+    return f"{type(exc).__name__}: {exc}".strip()
+
+
+def _run_one(task, schema_name, timeout, using):
+    connection = connections[using]
+    start = time.perf_counter()
+    try:
+        with schema_context(schema_name), transaction.atomic(using=using):
+            if timeout:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout = %s", [int(timeout * 1000)])
+            value = task(schema_name, connection)
+        error = None
+    except Exception as exc:
+        value, error = None, _describe(exc)
+    return TenantResult(schema_name, value, error, time.perf_counter() - start)
+
+
+def _worker(task, schemas, results, stop, timeout, using):
+    try:
+        while not stop.is_set():
+            try:
+                schema_name = schemas.get_nowait()
+            except queue.Empty:
+                return
+            results.put(_run_one(task, schema_name, timeout, using))
+    finally:
+        # This thread's connection is not reused once the run is over
+        connections.close_all()
+        results.put(None)
+
+
+def fan_out(task, schemas=None, params=None, workers=None, timeout=None, using=DEFAULT_DB_ALIAS):
+    """
+    Runs task in every schema (all tenants by default) and yields a
+    TenantResult per schema in completion order.
+
+    task is either SQL, whose rows (or rowcount) become the value, or a
+    callable taking (schema_name, connection) that is called with the schema
+    already active. timeout is in seconds; pass 0 to disable it.
+    """
+    if schemas is None:
+        schemas = tenant_schemas()
+    if timeout is None:
+        timeout = getattr(settings, 'TENANT_FANOUT_TIMEOUT', 30)
+    workers = max(1, min(workers or getattr(settings, 'TENANT_FANOUT_WORKERS', 8), len(schemas) or 1))
+    if isinstance(task, str):
+        task = _run_sql(task, params)
+
+    pending = queue.Queue()
+    for schema_name in schemas:
+        pending.put(schema_name)
+    results = queue.Queue()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(task, pending, results, stop, timeout, using),
+            name=f"tenant-fanout-{i}",
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        running = len(threads)
+        while running:
+            result = results.get()
+            if result is None:
+                running -= 1
+            else:
+                yield result
+    finally:
+        # The caller stopped early: let in-flight tenants finish, start no more
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def reduce_tenants(task, reducer, initial, **kwargs):
+    """
+    fan_out() folded into one value: reducer(acc, schema_name, value) is
+    applied to each successful tenant as it arrives. Returns (acc, failures)
+    where failures is the list of failed TenantResults.
+    """
+    acc, failures = initial, []
+    for result in fan_out(task, **kwargs):
+        if result.ok:
+            acc = reducer(acc, result.schema_name, result.value)
+        else:
+            failures.append(result)
+    return acc, failures
@@ -0,0 +1,68 @@
+"""
+HyperLogLog distinct counting for per-tenant unique visitors.
+
+With PRECISION = 12 a sketch is 4096 one-byte registers (4 KB) whatever the
+traffic. The standard error of an estimate is 1.04 / sqrt(4096) ~= 1.6%, so
+about 95% of estimates fall within +/-3.3% of the true count. Merging sketches
+(register-wise max) gives the sketch of the union with the same error, which
+is how the 7 and 30 day counts are built from daily sketches.
+"""
+import math
+from hashlib import blake2b
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+# Bits of the 64-bit hash left after the register index
+VALUE_BITS = 64 - PRECISION
+VALUE_MASK = (1 << VALUE_BITS) - 1
+ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+
+def hash64(value):
+    if isinstance(value, str):
+        value = value.encode()
+    return int.from_bytes(blake2b(value, digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    __slots__ = ('registers',)
+
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers) if registers is not None else bytearray(REGISTERS)
+        if len(self.registers) != REGISTERS:
+            raise ValueError(f"expected {REGISTERS} registers, got {len(self.registers)}")
+
+    def add(self, value):
+        self.add_hash(hash64(value))
+
+    def add_hash(self, hashed):
+        index = hashed >> VALUE_BITS
+        # Position of the first 1 bit in the remaining bits
+        rank = VALUE_BITS - (hashed & VALUE_MASK).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    @classmethod
+    def union(cls, sketches):
+        """ Sketch of the union of all the given sketches (or register byte strings). """
+        registers = [s.registers if isinstance(s, cls) else s for s in sketches]
+        if not registers:
+            return cls()
+        if len(registers) == 1:
+            return cls(registers[0])
+        return cls(bytes(map(max, *registers)))
+
+    def count(self):
+        estimate = ALPHA * REGISTERS * REGISTERS / sum(2.0 ** -r for r in self.registers)
+        empty = self.registers.count(0)
+        # Small cardinalities: linear counting is more accurate
+        if estimate <= 2.5 * REGISTERS and empty:
+            return round(REGISTERS * math.log(REGISTERS / empty))
+        return round(estimate)
+
+    def to_bytes(self):
+        return bytes(self.registers)
@@ -0,0 +1,66 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from customers.models import Client, TenantRequest
+from customers.provisioning import bulk_approve, schema_name_for
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Times approving N synthetic TenantRequests with bulk_approve() against the "
+        "per-row save() path. Metadata writes only; everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def make_requests(self, count):
+        run = uuid.uuid4().hex[:8]
+        return TenantRequest.objects.bulk_create([
+            TenantRequest(tenant_name=f"bench {run} {i}", desired_domain=f"bench-{run}-{i}", email=f"bench{i}@example.com")
+            for i in range(count)
+        ])
+
+    def per_row(self, tenant_requests):
+        for tr in tenant_requests:
+            tr.is_approved = True
+            tr.status = "Approved"
+            tr.save()
+            tenant = Client(schema_name=schema_name_for(tr), tenant_name=tr.tenant_name, server_name="VPS-001",
+                            desired_domain=tr.desired_domain, email=tr.email)
+            tenant.auto_create_schema = False
+            tenant.save()
+            # Domains are added by the provisioning workers on both paths
+
+    def measure(self, label, func, count):
+        try:
+            with transaction.atomic():
+                tenant_requests = self.make_requests(count)
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    func(tenant_requests)
+                    elapsed = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(
+            f"{label}: {count} requests in {elapsed:.2f}s ({count / elapsed:.0f} req/s), {len(queries)} queries"
+        )
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        self.measure("per-row save()", self.per_row, count)
+        self.measure(
+            f"bulk_approve(batch_size={options['batch_size']})",
+            lambda trs: bulk_approve(trs, batch_size=options['batch_size']),
+            count,
+        )
@@ -0,0 +1,54 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from core_app.benchmarks import format_latency
+from customers.models import Client
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates requests against tenant schemas and reports connections opened "
+        "and `SET search_path` round trips per 1k requests, plus per-request latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--tenants', type=int, default=20, help="Number of tenant schemas to rotate through.")
+        parser.add_argument(
+            '--conn-max-age', type=int, default=None,
+            help="Override CONN_MAX_AGE for the run (0 reproduces a connection per request)."
+        )
+
+    def handle(self, *args, **options):
+        schemas = list(Client.objects.values_list('schema_name', flat=True)[:options['tenants']]) or ['public']
+        if options['conn_max_age'] is not None:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = options['conn_max_age']
+
+        opened = []
+        connection_created.connect(lambda sender, connection, **kwargs: opened.append(1), weak=False)
+        sets_before = getattr(connection, 'search_path_statements', 0)
+
+        samples = []
+        for _ in range(options['requests']):
+            start = time.perf_counter_ns()
+            request_started.send(sender=self.__class__)
+            connection.set_schema(random.choice(schemas))
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            samples.append(time.perf_counter_ns() - start)
+
+        per_1k = 1000 / options['requests']
+        sets = getattr(connection, 'search_path_statements', 0) - sets_before
+        self.stdout.write(f"schemas={len(schemas)} conn_max_age={connection.settings_dict['CONN_MAX_AGE']} "
+                          f"transaction_pooling={connection.settings_dict.get('TRANSACTION_POOLING', False)}")
+        self.stdout.write(f"connections opened per 1k requests: {len(opened) * per_1k:.1f}")
+        self.stdout.write(f"SET search_path round trips per 1k requests: {sets * per_1k:.1f}")
+        self.stdout.write(format_latency("request", samples))
@@ -0,0 +1,56 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from customers.hll import HyperLogLog, REGISTERS
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the visitor HyperLogLog: per-hit cost, size and error at 1M hits/day, and 7/30-day merges."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hits', type=int, default=1_000_000, help="Hits in the single-day run.")
+        parser.add_argument('--visitors', type=int, default=250_000, help="Distinct visitors among those hits.")
+        parser.add_argument('--daily-visitors', type=int, default=20_000, help="Distinct visitors per day for the merge run.")
+        parser.add_argument('--pool', type=int, default=200_000, help="Visitor pool the days are drawn from.")
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        # One busy day: many repeat hits from a smaller set of visitors
+        visitors = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}|agent-{i % 97}" for i in range(options['visitors'])]
+        hits = [rng.choice(visitors) for _ in range(options['hits'])]
+        seen = set(hits)
+        sketch = HyperLogLog()
+        start = time.perf_counter()
+        for visitor in hits:
+            sketch.add(visitor)
+        elapsed = time.perf_counter() - start
+        estimate = sketch.count()
+        self.stdout.write(
+            f"1 day: {len(hits)} hits in {elapsed:.2f}s ({elapsed / len(hits) * 1e9:.0f}ns/hit), "
+            f"sketch {len(sketch.to_bytes())} bytes, exact {len(seen)}, estimate {estimate} "
+            f"({(estimate - len(seen)) / len(seen) * 100:+.2f}%)"
+        )
+
+        # 30 days of overlapping visitors, merged into 7 and 30 day counts
+        days, exact_days = [], []
+        for _ in range(30):
+            day_visitors = {f"visitor-{rng.randrange(options['pool'])}" for _ in range(options['daily_visitors'])}
+            day = HyperLogLog()
+            for visitor in day_visitors:
+                day.add(visitor)
+            days.append(day.to_bytes())
+            exact_days.append(day_visitors)
+        for window in (7, 30):
+            start = time.perf_counter()
+            estimate = HyperLogLog.union(days[-window:]).count()
+            elapsed = time.perf_counter() - start
+            exact = len(set().union(*exact_days[-window:]))
+            self.stdout.write(
+                f"{window} days: merge+count {elapsed * 1000:.1f}ms, exact {exact}, estimate {estimate} "
+                f"({(estimate - exact) / exact * 100:+.2f}%)"
+            )
+        self.stdout.write(f"Expected standard error: {1.04 / REGISTERS ** 0.5 * 100:.2f}%")
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django_tenants.utils import schema_context
+
+from customers.fanout import fan_out, tenant_schemas
+
+
+class Command(BaseCommand):
+    help = (
+        "Times one SQL statement across tenant schemas: a schema_context() loop on one "
+        "connection versus fan_out() on a pool of worker connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sql',
+            default="SELECT count(*), max(updated_at) FROM orders_subscriptionorder",
+            help="Statement run in every schema.",
+        )
+        parser.add_argument('--tenants', type=int, default=None, help="Only the first N tenant schemas.")
+        parser.add_argument('--workers', type=int, action='append', help="Pool sizes to try (repeatable).")
+
+    def handle(self, *args, **options):
+        schemas = tenant_schemas()[:options['tenants']]
+        if not schemas:
+            self.stdout.write("No tenant schemas.")
+            return
+
+        start = time.perf_counter()
+        for schema_name in schemas:
+            with schema_context(schema_name), connection.cursor() as cursor:
+                cursor.execute(options['sql'])
+                cursor.fetchall()
+        sequential = time.perf_counter() - start
+        self.stdout.write(
+            f"loop:      {len(schemas)} schema(s) in {sequential:.2f}s "
+            f"({sequential / len(schemas) * 1000:.1f}ms/schema)"
+        )
+
+        for workers in options['workers'] or [4, 8, 16]:
+            start = time.perf_counter()
+            results = list(fan_out(options['sql'], schemas, workers=workers))
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for result in results if not result.ok)
+            self.stdout.write(
+                f"workers={workers:<3} {len(schemas)} schema(s) in {elapsed:.2f}s "
+                f"({sequential / elapsed:.1f}x, {failed} failed)"
+            )
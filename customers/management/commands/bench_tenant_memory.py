@@ -0,0 +1,73 @@
+import gc
+import multiprocessing
+import os
+import resource
+import tracemalloc
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from customers.context import TenantContext
+from customers.models import Client
+
+
+def _rss_bytes():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # ru_maxrss is the peak, in KB on Linux and bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _full_client(i):
+    return Client(
+        pk=i,
+        schema_name=f"store{i}",
+        tenant_name=f"Store {i}",
+        server_name="VPS-001",
+        desired_domain=f"store{i}",
+        email=f"owner{i}@example.com",
+        company=f"Store {i} Pvt Ltd",
+        address=f"{i} Market Road, Sector {i % 90}, Hyderabad, Telangana 5000{i % 10}",
+        logo=f"tenant_logos/store{i}.png",
+        plan_id=i % 3 + 1,
+        plan_type='Basic',
+        subscription_end=date(2030, 1, 1),
+        next_due_date=date(2030, 1, 1),
+    )
+
+
+def _slim_context(i):
+    return TenantContext(i, f"store{i}", 'Active', i % 3 + 1, 'Basic', f"store{i}.localhost")
+
+
+def _measure(builder, count):
+    """ Runs in a forked child so each mode starts from the same heap. """
+    gc.collect()
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    cache = {f"store{i}.localhost": builder(i) for i in range(count)}
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _rss_bytes()
+    return len(cache), traced, rss_after - rss_before
+
+
+class Command(BaseCommand):
+    help = "Compares memory held by a hostname cache of full Client rows vs TenantContext objects."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenants', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        count = options['tenants']
+        ctx = multiprocessing.get_context('fork')
+        for label, builder in (("full Client", _full_client), ("TenantContext", _slim_context)):
+            with ctx.Pool(1) as pool:
+                entries, traced, rss = pool.apply(_measure, (builder, count))
+            self.stdout.write(
+                f"{label}: {entries} cached tenants, "
+                f"traced={traced / 1024 / 1024:.1f}MB ({traced / entries:.0f} B/tenant), "
+                f"rss_delta={rss / 1024 / 1024:.1f}MB"
+            )
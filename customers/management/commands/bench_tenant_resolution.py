@@ -0,0 +1,54 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django_tenants.utils import get_tenant_domain_model
+
+from core_app.benchmarks import format_latency, timed
+from customers.middleware import CachedTenantMiddleware
+from customers.context import TenantContext
+from customers.tenant_cache import TenantCache
+
+
+class Command(BaseCommand):
+    help = "Measures p50/p99 hostname -> tenant resolution time with and without the tenant cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--domains', type=int, default=10000, help="Number of distinct hostnames to resolve.")
+        parser.add_argument('--lookups', type=int, default=50000, help="Number of resolutions to time per mode.")
+        parser.add_argument(
+            '--synthetic', action='store_true',
+            help="Use in-memory tenants instead of the Domain table (measures the cache path only)."
+        )
+
+    def handle(self, *args, **options):
+        domain_model = get_tenant_domain_model()
+        if options['synthetic']:
+            hostnames = [f"store{i}.localhost" for i in range(options['domains'])]
+        else:
+            hostnames = list(domain_model.objects.values_list('domain', flat=True)[:options['domains']])
+            if not hostnames:
+                self.stderr.write("No Domain rows found; re-run with --synthetic.")
+                return
+        if len(hostnames) < options['domains']:
+            self.stdout.write(f"Only {len(hostnames)} domains available, benchmarking with those.")
+
+        lookups = [random.choice(hostnames) for _ in range(options['lookups'])]
+        middleware = CachedTenantMiddleware(lambda request: None)
+        cache = TenantCache(max_size=len(hostnames), ttl=3600)
+
+        if options['synthetic']:
+            for pk, hostname in enumerate(hostnames, start=1):
+                cache.set(hostname, TenantContext(pk, hostname.split('.')[0], 'Active', domain_url=hostname))
+        else:
+            uncached = [
+                timed(super(CachedTenantMiddleware, middleware).get_tenant, domain_model, hostname)[1]
+                for hostname in lookups
+            ]
+            self.stdout.write(format_latency("uncached (Domain + full Client)", uncached))
+            slim = [timed(TenantContext.for_hostname, hostname)[1] for hostname in lookups]
+            self.stdout.write(format_latency("uncached (slim projection)", slim))
+            for hostname in hostnames:
+                cache.set(hostname, TenantContext.for_hostname(hostname))
+
+        cached = [timed(cache.get, hostname)[1] for hostname in lookups]
+        self.stdout.write(format_latency(f"cached ({len(cache)} hostnames)", cached))
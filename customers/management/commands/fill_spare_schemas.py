@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from customers.models import SpareSchema
+from customers.provisioning import create_spare_schemas
+
+
+class Command(BaseCommand):
+    help = "Tops up the pool of pre-created spare tenant schemas that approvals rename into place."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=20, help="Number of spare schemas to keep ready.")
+
+    def handle(self, *args, **options):
+        missing = options['size'] - SpareSchema.objects.count()
+        if missing <= 0:
+            self.stdout.write("Spare schema pool is already full.")
+            return
+
+        start = time.monotonic()
+        try:
+            created = create_spare_schemas(missing, verbosity=max(options['verbosity'] - 1, 0))
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(created)} spare schemas in {time.monotonic() - start:.1f}s."
+        ))
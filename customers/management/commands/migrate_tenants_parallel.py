@@ -0,0 +1,159 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.migrations.loader import MigrationLoader
+from django_tenants.utils import get_public_schema_name, get_tenant_base_schema, schema_exists
+
+from core_app.checkpoint import Checkpoint
+from customers.models import Client, SpareSchema
+
+# Schemas per UNION ALL statement when reading django_migrations in bulk
+STATE_QUERY_CHUNK = 500
+
+
+def target_migrations():
+    """ Every migration in the project graph, as 'app.name' strings. """
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    return sorted(f"{app}.{name}" for app, name in loader.graph.nodes)
+
+
+def schemas_at_target(schemas, target):
+    """
+    Returns the subset of schemas whose django_migrations already holds every
+    target migration, using one catalog query plus one UNION ALL query per chunk.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT n.nspname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = 'django_migrations' AND n.nspname = ANY(%s)",
+            [list(schemas)],
+        )
+        with_table = [row[0] for row in cursor.fetchall()]
+
+        done = set()
+        for start in range(0, len(with_table), STATE_QUERY_CHUNK):
+            chunk = with_table[start:start + STATE_QUERY_CHUNK]
+            params = {'target': target}
+            selects = []
+            for i, schema_name in enumerate(chunk):
+                params[f's{i}'] = schema_name
+                selects.append(
+                    f"SELECT %(s{i})s, COUNT(*) FROM {connection.ops.quote_name(schema_name)}.django_migrations "
+                    f"WHERE app || '.' || name = ANY(%(target)s)"
+                )
+            cursor.execute(" UNION ALL ".join(selects), params)
+            done.update(schema_name for schema_name, applied in cursor.fetchall() if applied == len(target))
+    return done
+
+
+def migrate_schema(schema_name):
+    """ Pool worker: migrates one schema and reports (schema, error, seconds). """
+    start = time.monotonic()
+    try:
+        call_command(
+            'migrate_schemas',
+            tenant=True,
+            schema_name=schema_name,
+            interactive=False,
+            verbosity=0,
+            stdout=io.StringIO(),
+        )
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        connections.close_all()
+    return schema_name, error, time.monotonic() - start
+
+
+class Command(BaseCommand):
+    help = (
+        "Migrates tenant schemas across a process pool. Schemas already at the target "
+        "migration state are skipped, and progress is checkpointed so a crashed run resumes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int,
+            default=getattr(settings, 'TENANT_MULTIPROCESSING_MAX_PROCESSES', os.cpu_count() or 2),
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(tempfile.gettempdir(), 'migrate_tenants_parallel.json'),
+            help="Progress file used to resume an interrupted run.",
+        )
+        parser.add_argument('--restart', action='store_true', help="Ignore any existing checkpoint.")
+        parser.add_argument('-s', '--schema', dest='schemas', action='append', help="Only migrate these schemas.")
+
+    def handle(self, *args, **options):
+        target = target_migrations()
+        target_hash = hashlib.sha1("\n".join(target).encode()).hexdigest()
+
+        checkpoint = Checkpoint.load(options['checkpoint'])
+        if options['restart'] or checkpoint.data.get('target') != target_hash:
+            checkpoint.data = {'target': target_hash, 'done': [], 'failed': {}}
+
+        schemas = options['schemas'] or self.all_schemas()
+        already_done = set(checkpoint.data['done'])
+        pending = [s for s in schemas if s not in already_done]
+        up_to_date = schemas_at_target(pending, target) if pending else set()
+        pending = [s for s in pending if s not in up_to_date]
+        checkpoint.data['done'].extend(sorted(up_to_date))
+        checkpoint.save()
+
+        self.stdout.write(
+            f"{len(schemas)} schemas: {len(schemas) - len(pending)} already migrated, "
+            f"{len(pending)} to migrate on {options['processes']} processes."
+        )
+        if not pending:
+            checkpoint.clear()
+            return
+
+        # Forked workers must not share the parent's socket
+        connections.close_all()
+        start = time.monotonic()
+        completed = 0
+        ctx = multiprocessing.get_context('fork')
+        with ctx.Pool(processes=options['processes']) as pool:
+            for schema_name, error, elapsed in pool.imap_unordered(migrate_schema, pending):
+                completed += 1
+                if error:
+                    checkpoint.data['failed'][schema_name] = error
+                    self.stderr.write(f"[{schema_name}] failed after {elapsed:.1f}s: {error}")
+                else:
+                    checkpoint.data['done'].append(schema_name)
+                    checkpoint.data['failed'].pop(schema_name, None)
+                checkpoint.save()
+                if completed % 50 == 0 or completed == len(pending):
+                    rate = completed / (time.monotonic() - start)
+                    self.stdout.write(f"{completed}/{len(pending)} schemas, {rate:.1f} schemas/s")
+
+        failed = checkpoint.data['failed']
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            f"Migrated {len(pending) - len(failed)} schemas in {elapsed:.1f}s "
+            f"({len(pending) / elapsed:.1f} schemas/s), {len(failed)} failed."
+        )
+        if failed:
+            self.stdout.write(f"Re-run to retry the failures; progress is in {checkpoint.path}.")
+        else:
+            checkpoint.clear()
+
+    def all_schemas(self):
+        """ Tenant schemas plus the template and spare schemas new tenants are created from. """
+        schemas = list(
+            Client.objects.exclude(schema_name=get_public_schema_name()).values_list('schema_name', flat=True)
+        )
+        schemas += SpareSchema.objects.values_list('schema_name', flat=True)
+        base_schema = get_tenant_base_schema()
+        if base_schema and schema_exists(base_schema):
+            schemas.append(base_schema)
+        return schemas
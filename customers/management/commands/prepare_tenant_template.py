@@ -0,0 +1,41 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django_tenants.utils import get_tenant_base_schema, schema_context, schema_exists
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates (or brings up to date) the TENANT_BASE_SCHEMA template that new tenant "
+        "schemas are cloned from, optionally loading seed data into it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', action='append', default=[],
+            help="Fixture to load into the template. Set TENANT_TEMPLATE_CLONE_DATA to copy it to new tenants.",
+        )
+
+    def handle(self, *args, **options):
+        schema_name = get_tenant_base_schema()
+        if not schema_name:
+            raise CommandError("TENANT_BASE_SCHEMA is not set.")
+
+        if not schema_exists(schema_name):
+            with connection.cursor() as cursor:
+                cursor.execute('CREATE SCHEMA %s' % connection.ops.quote_name(schema_name))
+            self.stdout.write(f"Created schema {schema_name}.")
+
+        call_command(
+            'migrate_schemas',
+            tenant=True,
+            schema_name=schema_name,
+            interactive=False,
+            verbosity=options['verbosity'],
+        )
+
+        if options['seed']:
+            with schema_context(schema_name):
+                call_command('loaddata', *options['seed'], verbosity=options['verbosity'])
+
+        self.stdout.write(self.style.SUCCESS(f"Template schema {schema_name} is ready."))
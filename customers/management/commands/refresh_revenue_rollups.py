@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from customers.fanout import fan_out, tenant_schemas
+from customers.models import DailyRevenue, MonthlyRevenue, RevenueWatermark
+from customers.revenue import lock_months, rebuild_months, refresh_schema
+
+
+class Command(BaseCommand):
+    help = "Refreshes the revenue rollups from each tenant's orders and payments changed since its watermark."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recompute everything (catches deleted rows).")
+        parser.add_argument('--schema', action='append', dest='schemas', help="Only these tenant schemas.")
+        parser.add_argument('--workers', type=int, help="Tenants refreshed at once (default TENANT_FANOUT_WORKERS).")
+        parser.add_argument(
+            '--timeout', type=float,
+            help="Per-statement timeout in seconds, 0 for none (default TENANT_FANOUT_TIMEOUT, none with --full).",
+        )
+
+    def handle(self, *args, **options):
+        schemas = options['schemas'] or tenant_schemas()
+        timeout = options['timeout']
+        if timeout is None and options['full']:
+            # A full re-aggregation of a large tenant is expected to be slow
+            timeout = 0
+        months, failed = set(), 0
+        results = fan_out(
+            lambda schema_name, connection: refresh_schema(schema_name, full=options['full']),
+            schemas,
+            workers=options['workers'],
+            timeout=timeout,
+        )
+        for result in results:
+            if result.ok:
+                months |= result.value
+            else:
+                # Its watermark did not move, so the next run retries it
+                failed += 1
+                self.stderr.write(f"{result.schema_name}: {result.error}")
+
+        if failed and options['full']:
+            # The failed tenants' DailyRevenue is stale; rebuilding every month from it
+            # would publish wrong totals, so keep the current MonthlyRevenue instead
+            raise CommandError(
+                f"{failed} of {len(schemas)} tenant(s) failed to refresh; MonthlyRevenue was not rebuilt."
+            )
+
+        with transaction.atomic():
+            lock_months()
+            if options['full'] and not options['schemas']:
+                # Drop rollups of tenants that no longer exist and rebuild every month
+                DailyRevenue.objects.exclude(schema_name__in=schemas).delete()
+                RevenueWatermark.objects.exclude(schema_name__in=schemas).delete()
+                MonthlyRevenue.objects.all().delete()
+                months = {day.replace(day=1) for day in DailyRevenue.objects.dates('day', 'day')}
+            rebuild_months(months)
+        self.stdout.write(
+            f"Refreshed {len(schemas) - failed} tenant(s), {failed} failed, rebuilt {len(months)} month(s)."
+        )
+        if failed:
+            # Non-zero exit so the cron run is noticed; the failed tenants are retried next run
+            raise CommandError(f"{failed} tenant(s) failed to refresh.")
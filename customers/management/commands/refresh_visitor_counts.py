@@ -0,0 +1,42 @@
+from datetime import timedelta
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from customers.hll import HyperLogLog
+from customers.models import Client, VisitorSketch
+from customers.visitors import visitor_sketches
+
+
+class Command(BaseCommand):
+    help = "Merges the daily visitor sketches into Client.visitor_count_7d / visitor_count_30d and drops sketches older than 30 days."
+
+    def handle(self, *args, **options):
+        visitor_sketches.flush()
+        today = timezone.localdate()
+        week_start, month_start = today - timedelta(days=6), today - timedelta(days=29)
+
+        counts = {}
+        rows = (
+            VisitorSketch.objects.filter(day__gte=month_start)
+            .order_by('tenant_id')
+            .values_list('tenant_id', 'day', 'registers')
+            .iterator(chunk_size=1000)
+        )
+        for tenant_id, days in groupby(rows, key=lambda row: row[0]):
+            days = list(days)
+            week = HyperLogLog.union([bytes(registers) for _, day, registers in days if day >= week_start])
+            month = HyperLogLog.union([bytes(registers) for _, _, registers in days])
+            counts[tenant_id] = (week.count(), month.count())
+
+        changed = []
+        for client in Client.objects.only('id', 'visitor_count_7d', 'visitor_count_30d'):
+            count_7d, count_30d = counts.get(client.pk, (0, 0))
+            if (client.visitor_count_7d, client.visitor_count_30d) != (count_7d, count_30d):
+                client.visitor_count_7d, client.visitor_count_30d = count_7d, count_30d
+                changed.append(client)
+        Client.objects.bulk_update(changed, ['visitor_count_7d', 'visitor_count_30d'], batch_size=500)
+
+        purged, _ = VisitorSketch.objects.filter(day__lt=month_start).delete()
+        self.stdout.write(f"Updated {len(changed)} tenant(s), purged {purged} old sketch(es).")
@@ -0,0 +1,54 @@
+import multiprocessing
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from customers.provisioning import claim_next_job, requeue_stale_jobs, run_provisioning_job
+
+
+def worker_loop(once, poll_interval):
+    """ Claims and runs jobs until the queue is empty (--once) or forever. """
+    processed = 0
+    try:
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if once:
+                    return processed
+                time.sleep(poll_interval)
+                continue
+            run_provisioning_job(job)
+            processed += 1
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Runs queued tenant provisioning jobs on a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty.")
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument(
+            '--stale-after', type=int, default=900,
+            help="Seconds after which a Running job is assumed to belong to a dead worker.",
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs(timedelta(seconds=options['stale_after']))
+        if requeued:
+            self.stdout.write(f"Re-queued {requeued} stale job(s).")
+
+        # Forked workers must not share the parent's socket
+        connections.close_all()
+        ctx = multiprocessing.get_context('fork')
+        with ctx.Pool(processes=options['workers']) as pool:
+            results = [
+                pool.apply_async(worker_loop, (options['once'], options['poll_interval']))
+                for _ in range(options['workers'])
+            ]
+            processed = sum(result.get() for result in results)
+        self.stdout.write(f"Processed {processed} provisioning job(s).")
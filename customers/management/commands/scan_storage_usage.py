@@ -0,0 +1,74 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django_tenants.utils import get_public_schema_name
+
+from core_app.checkpoint import Checkpoint
+from customers.models import Client
+from customers.storage import directory_size, file_size, schema_sizes, tenant_media_dir
+
+MB = 1024 * 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes Client.storage_used_mb: schema sizes from one catalog query plus each tenant's "
+        "logo and, with per-tenant media storage, its media walked in parallel across tenants, "
+        "skipping directories unchanged since the last run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--full', action='store_true', help="Ignore the directory cache and list everything.")
+        parser.add_argument(
+            '--cache',
+            default=os.path.join(tempfile.gettempdir(), 'scan_storage_usage.json'),
+            help="Directory cache kept between runs.",
+        )
+
+    def handle(self, *args, **options):
+        tenants = list(
+            Client.objects.exclude(schema_name=get_public_schema_name())
+            .select_related('plan')
+            .only('id', 'schema_name', 'tenant_name', 'logo', 'storage_used_mb', 'plan__max_storage_mb')
+        )
+        db_bytes = schema_sizes(tenant.schema_name for tenant in tenants)
+
+        cache = Checkpoint.load(options['cache'])
+        previous = cache.data
+
+        def media_bytes(tenant):
+            root = tenant_media_dir(tenant.schema_name)
+            total, visited, listed = directory_size(root, previous, options['full']) if root else (0, {}, 0)
+            if tenant.logo:
+                total += file_size(tenant.logo.name)
+            return total, visited, listed
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(media_bytes, tenants))
+
+        # Only directories seen this run are kept, so deleted ones drop out of the cache
+        cache.data = {}
+        changed, listed, over_quota = [], 0, []
+        for tenant, (media, visited, tenant_listed) in zip(tenants, results):
+            cache.data.update(visited)
+            listed += tenant_listed
+            used_mb = round((db_bytes.get(tenant.schema_name, 0) + media) / MB, 2)
+            if used_mb != tenant.storage_used_mb:
+                tenant.storage_used_mb = used_mb
+                changed.append(tenant)
+            if tenant.plan and tenant.plan.max_storage_mb and used_mb > tenant.plan.max_storage_mb:
+                over_quota.append(tenant)
+        Client.objects.bulk_update(changed, ['storage_used_mb'], batch_size=500)
+        cache.save()
+
+        self.stdout.write(
+            f"Scanned {len(tenants)} tenant(s): {listed} of {len(cache.data)} media directories listed, "
+            f"{len(changed)} tenant(s) updated."
+        )
+        for tenant in over_quota:
+            self.stdout.write(
+                f"Over quota: {tenant.tenant_name} ({tenant.storage_used_mb}MB of {tenant.plan.max_storage_mb}MB)"
+            )
@@ -0,0 +1,188 @@
+import multiprocessing
+import os
+import smtplib
+import tempfile
+import time
+from collections import deque
+from contextlib import suppress
+from datetime import timedelta
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.utils import timezone
+
+from core_app.checkpoint import Checkpoint
+from core_app.emails.utils import PLAIN_TEXT_BODY
+from customers.models import Client
+
+TEMPLATE_NAME = "emails/payment_reminder.html"
+FIELDS = ('id', 'tenant_name', 'email', 'desired_domain', 'next_due_date', 'plan_type', 'payment_plan', 'payment_mode')
+
+# Compiled once per render process, see render_batch()
+_template = None
+
+
+def render_batch(rows):
+    """ Pool worker: renders a batch of reminder rows with the process's compiled template. """
+    global _template
+    if _template is None:
+        _template = get_template(TEMPLATE_NAME)
+    rendered = []
+    for row in rows:
+        context = dict(zip(FIELDS, row))
+        context['domain'] = f"{context['desired_domain']}.localhost"
+        context['due_date'] = context['next_due_date']
+        subject = f"Payment reminder: due on {context['next_due_date']:%d %b %Y}"
+        rendered.append((context['id'], context['email'], subject, _template.render(context)))
+    return rendered
+
+
+class RateLimiter:
+    """ Paces sends to at most `rate` messages per second on average. """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.start = time.monotonic()
+        self.sent = 0
+
+    def wait(self, count):
+        self.sent += count
+        ahead = self.sent / self.rate - (time.monotonic() - self.start)
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends payment reminders to tenants whose next_due_date is coming up. Rows are streamed "
+        "with a server-side cursor, rendered on a process pool from a template compiled once per "
+        "process, and sent in rate-limited batches over one SMTP connection. Progress is "
+        "checkpointed, so re-running the same campaign resumes where it stopped and retries the "
+        "reminders that failed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days-ahead', type=int, default=3, help="Remind tenants due within this many days.")
+        parser.add_argument('--rate', type=float, default=100, help="Maximum messages per second.")
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Render processes.")
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(tempfile.gettempdir(), 'send_payment_reminders.json'),
+        )
+        parser.add_argument('--restart', action='store_true', help="Ignore the checkpoint and start over.")
+        parser.add_argument('--dry-run', action='store_true', help="Render but do not send.")
+
+    def due_rows(self, days_ahead):
+        today = timezone.now().date()
+        return (
+            Client.objects.filter(next_due_date__range=(today, today + timedelta(days=days_ahead)))
+            .exclude(status='Cancelled')
+            .exclude(email__isnull=True)
+            .exclude(email='')
+            .order_by('id')
+            .values_list(*FIELDS)
+        )
+
+    def stream_batches(self, last_id, days_ahead, batch_size):
+        rows = self.due_rows(days_ahead).filter(id__gt=last_id).iterator(chunk_size=2000)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def send(self, smtp, rendered):
+        sent, failed = 0, []
+        for tenant_id, to_email, subject, html in rendered:
+            message = EmailMultiAlternatives(subject=subject, body=PLAIN_TEXT_BODY, to=[to_email], connection=smtp)
+            message.attach_alternative(html, "text/html")
+            try:
+                self.deliver(smtp, message)
+                sent += 1
+            except Exception as e:
+                failed.append(tenant_id)
+                self.stderr.write(f"Reminder for tenant {tenant_id} failed: {e}")
+        return sent, failed
+
+    def deliver(self, smtp, message):
+        try:
+            smtp.send_messages([message])
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # The server dropped the connection: reconnect and try this message once more
+            with suppress(Exception):
+                smtp.close()
+            smtp.open()
+            smtp.send_messages([message])
+
+    def retry_failed(self, smtp, checkpoint, days_ahead):
+        """ Resends reminders that failed on an earlier run of this campaign. """
+        retry = checkpoint.data['failed']
+        if not retry:
+            return 0
+        self.stdout.write(f"Retrying {len(retry)} reminders that failed earlier.")
+        # Tenants no longer due (paid, cancelled) drop out of the retry here
+        sent, failed = self.send(smtp, render_batch(list(self.due_rows(days_ahead).filter(id__in=retry))))
+        checkpoint.data['sent'] += sent
+        checkpoint.data['failed'] = failed
+        checkpoint.save()
+        return sent
+
+    def handle(self, *args, **options):
+        campaign = f"{timezone.now().date()}+{options['days_ahead']}"
+        checkpoint = Checkpoint.load(options['checkpoint'])
+        if options['restart'] or checkpoint.data.get('campaign') != campaign:
+            checkpoint.data = {'campaign': campaign, 'last_id': 0, 'sent': 0, 'failed': []}
+        if checkpoint.data['last_id']:
+            self.stdout.write(f"Resuming campaign {campaign} after tenant id {checkpoint.data['last_id']}.")
+
+        limiter = RateLimiter(options['rate'])
+        smtp = get_connection()
+        start = time.monotonic()
+        sent_this_run = 0
+        # Bound the batches in flight so memory stays flat however many tenants are due
+        in_flight = deque()
+        max_in_flight = options['workers'] * 2
+        batches = self.stream_batches(checkpoint.data['last_id'], options['days_ahead'], options['batch_size'])
+
+        with multiprocessing.get_context('fork').Pool(processes=options['workers']) as pool:
+            if not options['dry_run']:
+                smtp.open()
+            try:
+                if not options['dry_run']:
+                    sent_this_run += self.retry_failed(smtp, checkpoint, options['days_ahead'])
+                while True:
+                    for batch in batches:
+                        in_flight.append(pool.apply_async(render_batch, (batch,)))
+                        if len(in_flight) >= max_in_flight:
+                            break
+                    if not in_flight:
+                        break
+                    # Results are taken in submission order, so last_id only moves forward
+                    rendered = in_flight.popleft().get()
+                    if options['dry_run']:
+                        sent, failed = len(rendered), []
+                    else:
+                        limiter.wait(len(rendered))
+                        sent, failed = self.send(smtp, rendered)
+                    sent_this_run += sent
+                    checkpoint.data['sent'] += sent
+                    checkpoint.data['failed'] += failed
+                    checkpoint.data['last_id'] = rendered[-1][0]
+                    checkpoint.save()
+                    elapsed = time.monotonic() - start
+                    self.stdout.write(
+                        f"{checkpoint.data['sent']} sent (last tenant id {checkpoint.data['last_id']}), "
+                        f"{sent_this_run / elapsed:.0f} msg/s"
+                    )
+            finally:
+                smtp.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Campaign {campaign}: {checkpoint.data['sent']} reminders sent, "
+            f"{len(checkpoint.data['failed'])} failed (kept in {checkpoint.path} and retried on the next run)."
+        ))
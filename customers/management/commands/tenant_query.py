@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from customers.fanout import fan_out, reduce_tenants
+
+
+def rows_of(value):
+    """ SQL results are rows, or a rowcount for statements that return none. """
+    return value if isinstance(value, list) else [(value,)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs one SQL statement in every tenant schema concurrently and prints each tenant's "
+        "rows as it finishes, e.g. tenant_query \"SELECT count(*) FROM orders_subscriptionorder\" --sum"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sql')
+        parser.add_argument('--schema', action='append', dest='schemas', help="Only these tenant schemas.")
+        parser.add_argument('--workers', type=int, help="Schemas queried at once (default TENANT_FANOUT_WORKERS).")
+        parser.add_argument('--timeout', type=float, help="Per-tenant statement timeout in seconds, 0 for none.")
+        parser.add_argument('--sum', action='store_true', help="Print only the total of the first column.")
+
+    def handle(self, *args, **options):
+        fan_out_options = {
+            'schemas': options['schemas'],
+            'workers': options['workers'],
+            'timeout': options['timeout'],
+        }
+        if options['sum']:
+            (total, done), failed = reduce_tenants(
+                options['sql'],
+                lambda acc, schema_name, value: (acc[0] + sum(row[0] or 0 for row in rows_of(value)), acc[1] + 1),
+                (0, 0),
+                **fan_out_options,
+            )
+            for result in failed:
+                self.stderr.write(f"{result.schema_name}: {result.error}")
+            self.stdout.write(str(total))
+        else:
+            done, failed = 0, []
+            for result in fan_out(options['sql'], **fan_out_options):
+                if not result.ok:
+                    failed.append(result)
+                    self.stderr.write(f"{result.schema_name}: {result.error}")
+                    continue
+                done += 1
+                for row in rows_of(result.value):
+                    self.stdout.write(f"{result.schema_name}\t" + "\t".join(str(value) for value in row))
+
+        self.stderr.write(
+            f"{done} tenant(s) ok, {len(failed)} failed "
+            f"({sum(1 for result in failed if result.timed_out)} timed out)."
+        )
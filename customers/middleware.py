@@ -0,0 +1,72 @@
+from django.core.exceptions import DisallowedHost
+from django.db import connection
+from django.http import HttpResponseForbidden, HttpResponseNotFound
+from django_tenants.middleware import TenantMainMiddleware
+from django_tenants.utils import get_public_schema_name, get_tenant_domain_model
+
+from .context import TenantContext
+from .status_gate import tenant_status_gate
+from .tenant_cache import tenant_cache
+from .visitors import visitor_sketches
+from accounts.signals import get_client_ip
+
+
+class CachedTenantMiddleware(TenantMainMiddleware):
+    """
+    Drop-in replacement for django_tenants' TenantMiddleware.
+
+    Resolves the request hostname through an in-process LRU/TTL cache so the
+    Domain lookup only runs on a miss, attaches a slim TenantContext instead of
+    the full Client row, and rejects Suspended or Cancelled tenants before the
+    connection is switched to their schema.
+    """
+
+    def process_request(self, request):
+        connection.set_schema_to_public()
+        try:
+            hostname = self.hostname_from_request(request)
+        except DisallowedHost:
+            return HttpResponseNotFound()
+
+        domain_model = get_tenant_domain_model()
+        try:
+            tenant = self.get_tenant(domain_model, hostname)
+        except domain_model.DoesNotExist:
+            return self.no_tenant_found(request, hostname)
+
+        status = tenant_status_gate.blocked_status(tenant.schema_name)
+        if status:
+            return HttpResponseForbidden("<h2> Store Unavailable </h2>"
+                f"<p>This store is currently {status.lower()}.</p>"
+            )
+
+        request.tenant = tenant
+        connection.set_tenant(request.tenant)
+        self.setup_url_routing(request)
+
+    def get_tenant(self, domain_model, hostname):
+        tenant_status_gate.ensure_started()
+        tenant = tenant_cache.get(hostname)
+        if tenant is None:
+            tenant = TenantContext.for_hostname(hostname)
+            tenant_cache.set(hostname, tenant)
+        # The cached context is shared; the request gets its own copy
+        return tenant.for_request()
+
+
+class VisitorSketchMiddleware:
+    """
+    Counts each tenant's distinct visitors per day (by client IP and user agent)
+    into an in-memory HyperLogLog; see customers.visitors. Must come after
+    CachedTenantMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tenant = getattr(request, 'tenant', None)
+        if tenant is not None and tenant.schema_name != get_public_schema_name():
+            visitor = f"{get_client_ip(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+            visitor_sketches.record(tenant.pk, visitor)
+        return self.get_response(request)
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpareSchema",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("schema_name", models.CharField(max_length=63, unique=True)),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["created_on"],
+            },
+        ),
+    ]
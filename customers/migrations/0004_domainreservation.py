@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0003_provisioningjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DomainReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=253, unique=True)),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Set once the domain is live.",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="domain_reservations",
+                        to="customers.client",
+                    ),
+                ),
+                (
+                    "tenant_request",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="domain_reservations",
+                        to="customers.tenantrequest",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:52
+
+from django.db import migrations
+
+DOMAIN_SUFFIX = ".localhost"
+
+
+def normalize(domain_name):
+    # Frozen copy of customers.reservations.normalize_domain
+    name = (domain_name or "").strip().lower().rstrip(".")
+    if name.endswith(DOMAIN_SUFFIX):
+        name = name[: -len(DOMAIN_SUFFIX)]
+    return name
+
+
+def backfill(apps, schema_editor):
+    Domain = apps.get_model("customers", "Domain")
+    TenantRequest = apps.get_model("customers", "TenantRequest")
+    DomainReservation = apps.get_model("customers", "DomainReservation")
+
+    # Live domains first, so they win over requests for the same name
+    DomainReservation.objects.bulk_create(
+        [
+            DomainReservation(name=normalize(domain), tenant_id=tenant_id)
+            for domain, tenant_id in Domain.objects.values_list(
+                "domain", "tenant_id"
+            ).iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    DomainReservation.objects.bulk_create(
+        [
+            DomainReservation(name=normalize(desired_domain), tenant_request_id=pk)
+            for pk, desired_domain in TenantRequest.objects.exclude(status="Rejected")
+            .values_list("pk", "desired_domain")
+            .iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0004_domainreservation"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0005_backfill_domain_reservations"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VisitorSketch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("registers", models.BinaryField()),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="visitor_sketches",
+                        to="customers.client",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["day"], name="customers_v_day_8e6c5d_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tenant", "day"), name="unique_visitor_sketch_per_day"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,132 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0006_visitorsketch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevenueWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("schema_name", models.CharField(max_length=63, unique=True)),
+                ("orders_through", models.DateTimeField(blank=True, null=True)),
+                ("payments_through", models.DateTimeField(blank=True, null=True)),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("schema_name", models.CharField(max_length=63)),
+                ("day", models.DateField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("Order", "Order"), ("Payment", "Payment")],
+                        max_length=10,
+                    ),
+                ),
+                ("currency", models.CharField(max_length=10)),
+                (
+                    "provider",
+                    models.CharField(
+                        blank=True, help_text="Payments only.", max_length=50
+                    ),
+                ),
+                ("status", models.CharField(max_length=20)),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "plan",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="customers.plan",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["schema_name", "kind", "day"],
+                        name="customers_d_schema__eebaf2_idx",
+                    ),
+                    models.Index(fields=["day"], name="customers_d_day_dda52c_idx"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="MonthlyRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(help_text="First day of the month.")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("Order", "Order"), ("Payment", "Payment")],
+                        max_length=10,
+                    ),
+                ),
+                ("currency", models.CharField(max_length=10)),
+                ("provider", models.CharField(blank=True, max_length=50)),
+                ("status", models.CharField(max_length=20)),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                (
+                    "plan",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="customers.plan",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["month"], name="customers_m_month_28997d_idx")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_tenants(apps, schema_editor):
+    # Approved requests were matched to their Client by schema name only; link each
+    # one whose name and domain agree, unless two requests map to the same tenant
+    Client = apps.get_model("customers", "Client")
+    TenantRequest = apps.get_model("customers", "TenantRequest")
+    tenants = {
+        schema_name: (pk, desired_domain)
+        for pk, schema_name, desired_domain in Client.objects.values_list(
+            "pk", "schema_name", "desired_domain"
+        )
+    }
+    matches = {}
+    for tr in TenantRequest.objects.filter(is_approved=True).only(
+        "pk", "tenant_name", "desired_domain"
+    ):
+        # Frozen copy of customers.provisioning.schema_name_for
+        schema_name = tr.tenant_name.lower().replace(" ", "_")
+        tenant = tenants.get(schema_name)
+        if tenant and tenant[1] == tr.desired_domain:
+            matches.setdefault(tenant[0], []).append(tr.pk)
+    for tenant_id, request_ids in matches.items():
+        if len(request_ids) == 1:
+            TenantRequest.objects.filter(pk=request_ids[0]).update(tenant_id=tenant_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0007_revenue_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenantrequest",
+            name="tenant",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="tenant_request",
+                to="customers.client",
+            ),
+        ),
+        migrations.RunPython(link_tenants, migrations.RunPython.noop),
+    ]
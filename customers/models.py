@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django_tenants.models import TenantMixin, DomainMixin
 from django.utils import timezone
@@ -136,6 +137,9 @@ class Client(TenantMixin):
 
     #  Django Tenants Required
     auto_create_schema = True
+    # With TENANT_BASE_SCHEMA set, new schemas are cloned from the template;
+    # copy its rows too only if the template carries seed data
+    clone_mode = "DATA" if getattr(settings, 'TENANT_TEMPLATE_CLONE_DATA', False) else "NODATA"
 
     def __str__(self):
         return self.tenant_name
@@ -156,6 +160,21 @@ class Client(TenantMixin):
 class Domain(DomainMixin):
     pass
 
+class SpareSchema(models.Model):
+    """
+    A pre-created tenant schema (cloned from the template) waiting to be
+    renamed to a new tenant's schema_name on approval.
+    """
+    schema_name = models.CharField(max_length=63, unique=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_on"]
+
+    def __str__(self):
+        return self.schema_name
+
+
 class TenantRequest(models.Model):
     tenant_name = models.CharField(max_length=100)
     desired_domain = models.CharField(max_length=150)
@@ -191,7 +210,149 @@ class TenantRequest(models.Model):
         ('Rejected', 'Rejected'),
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
+    # The Client this request was provisioned as. Retries only ever reuse this
+    # tenant, never one that merely has the same schema name.
+    tenant = models.OneToOneField(
+        Client,
+        on_delete=models.SET_NULL,
+        related_name="tenant_request",
+        null=True,
+        blank=True,
+    )
 
     def __str__(self):
         return f"{self.tenant_name} ({self.status})"
 
+
+
+class DomainReservation(models.Model):
+    """
+    One row per subdomain that is taken, whether by a pending TenantRequest
+    or by a live Domain. Names are stored normalized (see
+    customers.reservations.normalize_domain) and the unique index makes
+    claiming one race-free: the INSERT either wins or fails.
+    """
+    name = models.CharField(max_length=253, unique=True)
+    tenant_request = models.ForeignKey(
+        TenantRequest,
+        on_delete=models.CASCADE,
+        related_name="domain_reservations",
+        null=True,
+        blank=True,
+    )
+    tenant = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name="domain_reservations",
+        null=True,
+        blank=True,
+        help_text="Set once the domain is live."
+    )
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class ProvisioningJob(models.Model):
+    """
+    Background provisioning of an approved TenantRequest, run by
+    `manage.py run_provisioning_workers`. Every step checks what already
+    exists, so a failed job can simply be run again.
+    """
+    tenant_request = models.OneToOneField(
+        TenantRequest,
+        on_delete=models.CASCADE,
+        related_name="provisioning_job",
+    )
+    STATUS_CHOICES = [
+        ('Queued', 'Queued'),
+        ('Running', 'Running'),
+        ('Succeeded', 'Succeeded'),
+        ('Failed', 'Failed'),
+    ]
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Queued')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    email_sent = models.BooleanField(default=False)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Retries are delayed until this time.")
+    created_on = models.DateTimeField(auto_now_add=True)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.tenant_request.tenant_name} ({self.status})"
+
+
+class VisitorSketch(models.Model):
+    """
+    HyperLogLog sketch (customers.hll) of one tenant's distinct visitors on one day.
+    Merged by `manage.py refresh_visitor_counts` into visitor_count_7d/30d.
+    """
+    tenant = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="visitor_sketches")
+    day = models.DateField()
+    registers = models.BinaryField()
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tenant", "day"], name="unique_visitor_sketch_per_day"),
+        ]
+        indexes = [models.Index(fields=["day"])]
+
+    def __str__(self):
+        return f"{self.tenant_id} @ {self.day}"
+
+
+class DailyRevenue(models.Model):
+    """
+    Per-tenant, per-day totals of orders.SubscriptionOrder / Payment (which live in
+    the tenant schemas), maintained by `manage.py refresh_revenue_rollups`.
+    """
+    KIND_CHOICES = [
+        ('Order', 'Order'),
+        ('Payment', 'Payment'),
+    ]
+    schema_name = models.CharField(max_length=63)
+    day = models.DateField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    plan = models.ForeignKey(Plan, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    currency = models.CharField(max_length=10)
+    provider = models.CharField(max_length=50, blank=True, help_text="Payments only.")
+    status = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["schema_name", "kind", "day"]),
+            models.Index(fields=["day"]),
+        ]
+
+
+class MonthlyRevenue(models.Model):
+    """ DailyRevenue summed over all tenants per month; what the revenue dashboard reads. """
+    month = models.DateField(help_text="First day of the month.")
+    kind = models.CharField(max_length=10, choices=DailyRevenue.KIND_CHOICES)
+    plan = models.ForeignKey(Plan, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    currency = models.CharField(max_length=10)
+    provider = models.CharField(max_length=50, blank=True)
+    status = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["month"])]
+
+
+class RevenueWatermark(models.Model):
+    """ How far each tenant schema's orders and payments have been rolled up. """
+    schema_name = models.CharField(max_length=63, unique=True)
+    orders_through = models.DateTimeField(null=True, blank=True)
+    payments_through = models.DateTimeField(null=True, blank=True)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.schema_name
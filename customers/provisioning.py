@@ -0,0 +1,323 @@
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Value
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django_tenants.postgresql_backend.base import is_valid_schema_name
+from django_tenants.utils import get_public_schema_name, get_tenant_base_schema, schema_context, schema_exists
+
+from core_app.emails.utils import send_html_email
+from .models import Client, Domain, DomainReservation, ProvisioningJob, SpareSchema, TenantRequest
+from .reservations import DomainTaken, normalize_domain
+from .status_gate import notify_status_change
+from .tenant_cache import tenant_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ProvisioningConflict(Exception):
+    """ The schema or domain a request needs already belongs to another tenant. """
+
+
+def claim_spare_schema(schema_name):
+    """
+    Renames a pre-created spare schema to schema_name.
+    Returns False when the pool is empty. Concurrent approvals never get the
+    same spare thanks to SKIP LOCKED, and the rename is rolled back together
+    with the pool row if anything fails.
+    """
+    with transaction.atomic():
+        spare = SpareSchema.objects.select_for_update(skip_locked=True).first()
+        if spare is None:
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute('ALTER SCHEMA %s RENAME TO %s' % (
+                connection.ops.quote_name(spare.schema_name),
+                connection.ops.quote_name(schema_name),
+            ))
+        spare.delete()
+    return True
+
+
+def provision_schema(schema_name):
+    """
+    Makes sure schema_name exists before its Client is saved.
+    Uses a spare schema when one is available; otherwise Client.save() creates
+    the schema itself, cloning TENANT_BASE_SCHEMA if it has been prepared.
+    """
+    if schema_exists(schema_name):
+        return True
+    return claim_spare_schema(schema_name)
+
+
+def create_spare_schemas(count, verbosity=0):
+    """ Clones `count` new spare schemas from the template and adds them to the pool. """
+    base_schema = get_tenant_base_schema()
+    if not base_schema or not schema_exists(base_schema):
+        raise RuntimeError(
+            "The template schema does not exist yet, run `manage.py prepare_tenant_template` first."
+        )
+    created = []
+    for _ in range(count):
+        schema_name = f"spare_{uuid.uuid4().hex[:16]}"
+        # An unsaved Client is enough for create_schema() to clone the template
+        Client(schema_name=schema_name).create_schema(verbosity=verbosity)
+        SpareSchema.objects.create(schema_name=schema_name)
+        created.append(schema_name)
+    return created
+
+
+def schema_name_for(tenant_request):
+    return tenant_request.tenant_name.lower().replace(" ", "_")
+
+
+def provision_tenant(tenant_request):
+    """
+    Creates the Client, its schema and its primary Domain for a TenantRequest,
+    skipping whatever a previous attempt already created. Only the Client
+    linked to the request (TenantRequest.tenant) is reused; a schema or domain
+    owned by anyone else raises ProvisioningConflict.
+    """
+    schema_name = schema_name_for(tenant_request)
+    hostname = f"{tenant_request.desired_domain}.localhost"
+    with transaction.atomic():
+        tenant_request = TenantRequest.objects.select_for_update().select_related('tenant').get(pk=tenant_request.pk)
+        tenant = tenant_request.tenant
+        if tenant is None:
+            # Two requests can map to the same schema name; the first one owns it
+            if Client.objects.filter(schema_name__iexact=schema_name).exists():
+                raise ProvisioningConflict(f"schema '{schema_name}' belongs to another tenant")
+            if schema_exists(schema_name):
+                raise ProvisioningConflict(f"schema '{schema_name}' already exists without a tenant")
+            tenant = Client(
+                schema_name=schema_name,
+                tenant_name=tenant_request.tenant_name,
+                server_name="VPS-001",
+                desired_domain=tenant_request.desired_domain,
+                plan_type=tenant_request.plan_type,
+                payment_mode=tenant_request.payment_mode,
+                email=tenant_request.email,
+                company=tenant_request.company,
+                address=tenant_request.address,
+                logo=tenant_request.logo
+            )
+            # The schema is built below, once the row is linked to this request
+            tenant.auto_create_schema = False
+            tenant.save()
+            TenantRequest.objects.filter(pk=tenant_request.pk).update(tenant=tenant)
+
+    # Ours from here on, so an existing schema is one a previous attempt built
+    if not provision_schema(tenant.schema_name):
+        tenant.create_schema(check_if_exists=True)
+
+    domain, _ = Domain.objects.get_or_create(domain=hostname, defaults={'tenant': tenant, 'is_primary': True})
+    if domain.tenant_id != tenant.pk:
+        raise ProvisioningConflict(f"domain '{hostname}' belongs to another tenant")
+    TenantRequest.objects.filter(pk=tenant_request.pk).update(is_approved=True, status="Approved")
+    return tenant
+
+
+def send_tenant_created_email(tenant_request):
+    send_html_email(
+        subject="Your Tenant has been successfully created",
+        to_email=tenant_request.email,
+        template_name="emails/tenant_created.html",
+        context={
+            "owner_name": tenant_request.tenant_name,
+            "tenant_name": tenant_request.tenant_name,
+            "company": tenant_request.company,
+            "email": tenant_request.email,
+            "address": tenant_request.address,
+            "domain": tenant_request.desired_domain
+        }
+    )
+
+
+def enqueue_provisioning(tenant_requests):
+    """
+    Queues a ProvisioningJob for each request that does not have one yet and
+    re-queues failed ones. Returns the number of requests queued.
+    """
+    pending = [tr for tr in tenant_requests if not tr.is_approved]
+    queue_provisioning_jobs(pending)
+    return len(pending)
+
+
+def queue_provisioning_jobs(tenant_requests, batch_size=500):
+    ProvisioningJob.objects.bulk_create(
+        [ProvisioningJob(tenant_request=tr) for tr in tenant_requests],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    ProvisioningJob.objects.filter(tenant_request__in=tenant_requests, status='Failed').update(
+        status='Queued', attempts=0, run_after=timezone.now()
+    )
+
+
+def bulk_approve(tenant_requests, batch_size=500, build_schemas=True):
+    """
+    Approves a large batch of TenantRequests with batched metadata writes:
+    names are checked against existing tenants in one query, Client rows are
+    bulk-created in chunks and the requests are marked approved in bulk.
+    Schemas are built afterwards by the provisioning workers, which add each
+    Domain only once its schema exists, so no hostname ever resolves to a
+    missing schema.
+
+    Returns (approved requests, {request pk: reason} for the ones skipped).
+    """
+    public_schema = get_public_schema_name()
+    rejected = {}
+    candidates = []
+    schemas, names = set(), set()
+    for tr in tenant_requests:
+        if tr.is_approved:
+            continue
+        schema_name = schema_name_for(tr)
+        name = normalize_domain(tr.desired_domain)
+        if not is_valid_schema_name(schema_name) or schema_name == public_schema:
+            rejected[tr.pk] = f"invalid schema name '{schema_name}'"
+        elif schema_name.lower() in schemas or name in names:
+            rejected[tr.pk] = "duplicate of another request in this batch"
+        else:
+            schemas.add(schema_name.lower())
+            names.add(name)
+            candidates.append((tr, schema_name, name))
+
+    # One query for both checks. Schema names are unique ignoring case, like
+    # Client._check_schema_name_is_unique(); a domain is taken if anything other
+    # than the request itself reserved it.
+    taken = Client.objects.annotate(kind=Value('schema'), value=Lower('schema_name')).filter(
+        value__in=schemas
+    ).values_list('kind', 'value').union(
+        DomainReservation.objects.annotate(kind=Value('domain')).filter(name__in=names).exclude(
+            tenant_request__in=[tr for tr, _, _ in candidates], tenant__isnull=True
+        ).values_list('kind', 'name'),
+        all=True,
+    )
+    taken_schemas, taken_names = set(), set()
+    for kind, value in taken:
+        (taken_schemas if kind == 'schema' else taken_names).add(value)
+    # Schemas left behind by deleted tenants still hold their data
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT lower(nspname) FROM pg_namespace WHERE lower(nspname) = ANY(%s)", [list(schemas)])
+        taken_schemas.update(row[0] for row in cursor.fetchall())
+
+    accepted = []
+    for tr, schema_name, name in candidates:
+        if schema_name.lower() in taken_schemas:
+            rejected[tr.pk] = f"schema '{schema_name}' already exists"
+        elif name in taken_names:
+            rejected[tr.pk] = f"domain '{name}' is already taken"
+        else:
+            accepted.append((tr, name, Client(
+                schema_name=schema_name,
+                tenant_name=tr.tenant_name,
+                server_name="VPS-001",
+                desired_domain=tr.desired_domain,
+                plan_type=tr.plan_type,
+                payment_mode=tr.payment_mode,
+                email=tr.email,
+                company=tr.company,
+                address=tr.address,
+                logo=tr.logo
+            )))
+
+    with transaction.atomic():
+        # Hold each name for its request. Names reserved by anyone else are left
+        # alone, and the re-select catches a name claimed since the check above:
+        # that request is rejected before anything is written for it.
+        DomainReservation.objects.bulk_create(
+            [DomainReservation(name=name, tenant_request=tr) for tr, name, _ in accepted],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        held = DomainReservation.objects.select_for_update().in_bulk(
+            [name for _, name, _ in accepted], field_name='name'
+        )
+        approved, tenants, hostnames, reservations = [], [], [], []
+        for tr, name, tenant in accepted:
+            reservation = held.get(name)
+            if reservation is None or reservation.tenant_request_id != tr.pk or reservation.tenant_id is not None:
+                rejected[tr.pk] = f"domain '{name}' is already taken"
+                continue
+            approved.append(tr)
+            tenants.append(tenant)
+            hostnames.append(f"{name}.localhost")
+            reservations.append(reservation)
+        # bulk_create skips Client.save(), so no schema is built here
+        Client.objects.bulk_create(tenants, batch_size=batch_size)
+        # The names stay held for their tenants until provision_tenant() adds the Domain
+        for reservation, tenant in zip(reservations, tenants):
+            reservation.tenant = tenant
+        DomainReservation.objects.bulk_update(reservations, ['tenant'], batch_size=batch_size)
+        for tr, tenant in zip(approved, tenants):
+            tr.tenant = tenant
+            tr.is_approved = True
+            tr.status = "Approved"
+        TenantRequest.objects.bulk_update(approved, ['tenant', 'is_approved', 'status'], batch_size=batch_size)
+        if build_schemas:
+            queue_provisioning_jobs(approved, batch_size=batch_size)
+        # bulk_create skips the Client post_save receivers: broadcast the
+        # statuses (NOTIFY is sent on commit) and drop cached lookups ourselves
+        notify_status_change([(tenant.schema_name, tenant.status) for tenant in tenants])
+        transaction.on_commit(lambda: _forget_tenants(tenants, hostnames))
+    return approved, rejected
+
+
+def _forget_tenants(tenants, hostnames):
+    for hostname in hostnames:
+        tenant_cache.invalidate(hostname)
+    pks = {tenant.pk for tenant in tenants}
+    tenant_cache.invalidate_where(lambda hostname, tenant: tenant.pk in pks)
+
+
+def requeue_stale_jobs(stale_after):
+    """ Puts back jobs whose worker died while running them. """
+    return ProvisioningJob.objects.filter(
+        status='Running', updated_on__lt=timezone.now() - stale_after
+    ).update(status='Queued')
+
+
+def claim_next_job():
+    with transaction.atomic():
+        job = (
+            ProvisioningJob.objects.select_for_update(skip_locked=True)
+            .select_related('tenant_request')
+            .filter(status='Queued', run_after__lte=timezone.now())
+            .order_by('run_after')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = 'Running'
+        job.attempts += 1
+        job.save(update_fields=['status', 'attempts', 'updated_on'])
+    return job
+
+
+def run_provisioning_job(job):
+    max_attempts = getattr(settings, 'PROVISIONING_MAX_ATTEMPTS', 5)
+    try:
+        with schema_context(get_public_schema_name()):
+            provision_tenant(job.tenant_request)
+            if not job.email_sent:
+                send_tenant_created_email(job.tenant_request)
+                job.email_sent = True
+        job.status = 'Succeeded'
+        job.last_error = ''
+    except Exception as exc:
+        logger.exception("Provisioning %s failed (attempt %s).", job.tenant_request, job.attempts)
+        job.last_error = traceback.format_exc()
+        # A conflict will not go away by retrying
+        if job.attempts >= max_attempts or isinstance(exc, (ProvisioningConflict, DomainTaken)):
+            job.status = 'Failed'
+        else:
+            job.status = 'Queued'
+            job.run_after = timezone.now() + timedelta(seconds=30 * 2 ** (job.attempts - 1))
+    job.save(update_fields=['status', 'last_error', 'email_sent', 'run_after', 'updated_on'])
+    return job
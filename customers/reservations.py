@@ -0,0 +1,120 @@
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .models import DomainReservation
+
+DOMAIN_SUFFIX = ".localhost"
+
+# A single DNS label: letters, digits and inner hyphens, at most 63 characters
+LABEL_RE = re.compile(r'^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$')
+
+SUGGESTION_SUFFIXES = ("store", "shop", "online", "hq", "co")
+SUGGESTION_PREFIXES = ("my", "get", "the")
+
+
+class DomainTaken(Exception):
+    """ The domain is reserved by, or live for, a different tenant. """
+
+
+def normalize_domain(domain_name):
+    """ 'MyShop.localhost ' and 'myshop' are the same reservation: 'myshop'. """
+    name = (domain_name or "").strip().lower().rstrip(".")
+    if name.endswith(DOMAIN_SUFFIX):
+        name = name[:-len(DOMAIN_SUFFIX)]
+    return name
+
+
+def is_valid_label(name):
+    return bool(LABEL_RE.match(name))
+
+
+def _cache_key(name):
+    return f"domain-availability:{name}"
+
+
+def forget_availability(name):
+    cache.delete(_cache_key(name))
+
+
+def reserve_domain(name, tenant_request=None, tenant=None):
+    """
+    Claims a normalized domain name. Returns False if it is already taken.
+    Safe under concurrent signups: the unique index decides the winner.
+    """
+    try:
+        with transaction.atomic():
+            DomainReservation.objects.create(name=name, tenant_request=tenant_request, tenant=tenant)
+    except IntegrityError:
+        return False
+    return True
+
+
+def held_by_other(reservation, tenant_id):
+    """
+    Whether reservation belongs to someone other than tenant_id. A pending
+    reservation counts as the tenant's own if it was made by the request that
+    tenant was provisioned from.
+    """
+    if reservation.tenant_id is not None:
+        return reservation.tenant_id != tenant_id
+    request = reservation.tenant_request
+    return request is None or request.tenant_id != tenant_id
+
+
+def claim_live_domain(name, tenant_id):
+    """
+    Marks name as live for tenant_id, taking over the reservation of the
+    request it came from. Raises DomainTaken if anyone else holds it.
+    """
+    with transaction.atomic():
+        reservation = (
+            DomainReservation.objects.select_for_update()
+            .select_related('tenant_request')
+            .filter(name=name)
+            .first()
+        )
+        if reservation is None:
+            # A concurrent claim makes this INSERT fail on the unique index
+            DomainReservation.objects.create(name=name, tenant_id=tenant_id)
+        elif held_by_other(reservation, tenant_id):
+            raise DomainTaken(f"domain '{name}' is reserved by another tenant")
+        elif reservation.tenant_id != tenant_id:
+            reservation.tenant_id = tenant_id
+            reservation.save(update_fields=['tenant'])
+
+
+def suggest_alternatives(name, limit=5):
+    """
+    Ranked, available alternatives for a taken name, checked with one query.
+    Shorter and closer variants of the original rank first.
+    """
+    candidates = [f"{name}{n}" for n in range(1, 10)]
+    candidates += [f"{name}-{suffix}" for suffix in SUGGESTION_SUFFIXES]
+    candidates += [f"{prefix}{name}" for prefix in SUGGESTION_PREFIXES]
+    candidates = [c for c in candidates if is_valid_label(c)]
+    taken = set(DomainReservation.objects.filter(name__in=candidates).values_list('name', flat=True))
+    ranked = sorted(
+        (c for c in candidates if c not in taken),
+        key=lambda c: (len(c) - len(name), candidates.index(c)),
+    )
+    return ranked[:limit]
+
+
+def check_availability(name):
+    """
+    Returns {'available': bool, 'suggestions': [...]} for a normalized name.
+    Only "taken" answers (and their suggestions) are cached: the cache is per
+    worker, so a cached "available" could outlive a reservation made in
+    another worker. "Available" always comes from one indexed lookup.
+    """
+    key = _cache_key(name)
+    result = cache.get(key)
+    if result is None:
+        if not DomainReservation.objects.filter(name=name).exists():
+            return {'available': True, 'suggestions': []}
+        result = {'available': False, 'suggestions': suggest_alternatives(name)}
+        cache.set(key, result, getattr(settings, 'DOMAIN_TAKEN_CACHE_TTL', 300))
+    return result
@@ -0,0 +1,156 @@
+"""
+Revenue rollups over orders.SubscriptionOrder and Payment.
+
+Orders and payments live in each tenant schema. refresh_schema() finds the
+days touched since that schema's watermark (rows whose updated_at moved),
+re-aggregates just those days into DailyRevenue, and rebuild_months() then
+re-sums the affected months of MonthlyRevenue across all tenants. The
+dashboard reads only the rollups. Rows are bucketed by the day they were
+created. Deleted rows leave no trace for the watermark, which is what the
+nightly --full refresh is for.
+
+Runs may overlap (an incremental one and the nightly --full), and both
+delete-then-insert rollup rows, so each schema's refresh holds a per-schema
+advisory lock for its whole transaction and month rebuilds hold a global one.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from orders.models import Payment, SubscriptionOrder
+from .models import DailyRevenue, MonthlyRevenue, RevenueWatermark
+
+# Rows saved by transactions still open at refresh time may carry an earlier
+# updated_at than the ones we see, so the watermark trails "now" by this much
+WATERMARK_LAG = timedelta(seconds=60)
+
+
+def _lock(name):
+    """ Transaction-scoped advisory lock: concurrent holders of `name` run one at a time. """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [f"revenue:{name}"])
+
+
+def lock_months():
+    """ Serialises changes to MonthlyRevenue until the current transaction ends. """
+    _lock("months")
+
+
+def _day_bounds(days):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(min(days), time.min), tz)
+    end = timezone.make_aware(datetime.combine(max(days) + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def _changed_days(model, since, through, full):
+    rows = model.objects.all() if full or since is None else model.objects.filter(
+        updated_at__gt=since, updated_at__lte=through
+    )
+    return set(rows.dates('created_at', 'day'))
+
+
+def _aggregate(queryset, days, dimensions, full):
+    if not days:
+        return []
+    if not full:
+        start, end = _day_bounds(days)
+        queryset = queryset.filter(created_at__gte=start, created_at__lt=end)
+    rows = (
+        queryset.annotate(day=TruncDate('created_at'))
+        .values('day', *dimensions)
+        .annotate(count=Count('id'), total=Sum('amount'))
+    )
+    return [row for row in rows if row['day'] in days]
+
+
+def _replace(schema_name, kind, days, rows, full):
+    existing = DailyRevenue.objects.filter(schema_name=schema_name, kind=kind)
+    if not full:
+        existing = existing.filter(day__in=days)
+    existing.delete()
+    DailyRevenue.objects.bulk_create(
+        [
+            DailyRevenue(
+                schema_name=schema_name,
+                kind=kind,
+                day=row['day'],
+                plan_id=row['plan_id'],
+                currency=row['currency'],
+                provider=row.get('provider', ''),
+                status=row['status'],
+                count=row['count'],
+                amount=row['total'] or 0,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+def refresh_schema(schema_name, full=False):
+    """ Brings one tenant's DailyRevenue up to date. Returns the months it touched. """
+    with transaction.atomic():
+        # Everything below, including reading the watermark, happens under the lock
+        _lock(f"schema:{schema_name}")
+        watermark, _ = RevenueWatermark.objects.get_or_create(schema_name=schema_name)
+        through = timezone.now() - WATERMARK_LAG
+        with schema_context(schema_name):
+            order_days = _changed_days(SubscriptionOrder, watermark.orders_through, through, full)
+            payment_days = _changed_days(Payment, watermark.payments_through, through, full)
+            order_rows = _aggregate(
+                SubscriptionOrder.objects.all(), order_days, ('plan_id', 'currency', 'status'), full
+            )
+            payment_rows = _aggregate(
+                Payment.objects.annotate(plan_id=F('order__plan_id')),
+                payment_days,
+                ('plan_id', 'currency', 'provider', 'status'),
+                full,
+            )
+        if order_days or full:
+            _replace(schema_name, 'Order', order_days, order_rows, full)
+        if payment_days or full:
+            _replace(schema_name, 'Payment', payment_days, payment_rows, full)
+        watermark.orders_through = watermark.payments_through = through
+        watermark.save(update_fields=['orders_through', 'payments_through', 'updated_on'])
+    return {day.replace(day=1) for day in order_days | payment_days}
+
+
+def rebuild_months(months):
+    """ Re-sums the given months of MonthlyRevenue from DailyRevenue (all tenants). """
+    if not months:
+        return
+    months = set(months)
+    first = min(months)
+    last = max(months)
+    end = (last + timedelta(days=32)).replace(day=1)
+    rows = (
+        DailyRevenue.objects.filter(day__gte=first, day__lt=end)
+        .annotate(month=TruncMonth('day'))
+        .values('month', 'kind', 'plan_id', 'currency', 'provider', 'status')
+        .annotate(total_count=Sum('count'), total=Sum('amount'))
+    )
+    with transaction.atomic():
+        lock_months()
+        MonthlyRevenue.objects.filter(month__in=months).delete()
+        MonthlyRevenue.objects.bulk_create(
+            [
+                MonthlyRevenue(
+                    month=row['month'],
+                    kind=row['kind'],
+                    plan_id=row['plan_id'],
+                    currency=row['currency'],
+                    provider=row['provider'],
+                    status=row['status'],
+                    count=row['total_count'],
+                    amount=row['total'],
+                )
+                for row in rows
+                if row['month'] in months
+            ],
+            batch_size=1000,
+        )
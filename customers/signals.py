@@ -0,0 +1,74 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db import connection
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name
+
+from .models import Client, Domain, DomainReservation, TenantRequest
+from .reservations import DomainTaken, claim_live_domain, forget_availability, held_by_other, normalize_domain
+from .status_gate import notify_status_change
+from .tenant_cache import tenant_cache
+from .usage import usage_counters
+
+
+@receiver([post_save, post_delete], sender=Domain, dispatch_uid="customers_domain_cache_invalidate")
+def invalidate_domain(sender, instance, **kwargs):
+    # The hostname may have been edited, so drop the old entries by tenant too
+    tenant_cache.invalidate(instance.domain)
+    tenant_cache.invalidate_tenant(instance.tenant_id)
+
+
+@receiver([post_save, post_delete], sender=Client, dispatch_uid="customers_client_cache_invalidate")
+def invalidate_client(sender, instance, **kwargs):
+    tenant_cache.invalidate_tenant(instance.pk)
+
+
+@receiver(post_save, sender=Client, dispatch_uid="customers_client_status_notify")
+def broadcast_client_status(sender, instance, **kwargs):
+    notify_status_change([(instance.schema_name, instance.status)])
+
+
+@receiver(post_delete, sender=Client, dispatch_uid="customers_client_delete_notify")
+def broadcast_client_deleted(sender, instance, **kwargs):
+    notify_status_change([(instance.schema_name, None)])
+
+
+@receiver(pre_save, sender=Domain, dispatch_uid="customers_domain_check_owner")
+def check_domain_owner(sender, instance, **kwargs):
+    # Refuse before the row is written; post_save runs after an autocommit save
+    reservation = (
+        DomainReservation.objects.select_related('tenant_request')
+        .filter(name=normalize_domain(instance.domain))
+        .first()
+    )
+    if reservation is not None and held_by_other(reservation, instance.tenant_id):
+        raise DomainTaken(f"domain '{instance.domain}' is reserved by another tenant")
+
+
+@receiver(post_save, sender=Domain, dispatch_uid="customers_domain_reserve")
+def reserve_live_domain(sender, instance, **kwargs):
+    claim_live_domain(normalize_domain(instance.domain), instance.tenant_id)
+
+
+@receiver(post_delete, sender=Domain, dispatch_uid="customers_domain_release")
+def release_live_domain(sender, instance, **kwargs):
+    DomainReservation.objects.filter(name=normalize_domain(instance.domain), tenant_id=instance.tenant_id).delete()
+
+
+@receiver(post_save, sender=TenantRequest, dispatch_uid="customers_request_release")
+def release_rejected_request(sender, instance, **kwargs):
+    if instance.status == 'Rejected':
+        DomainReservation.objects.filter(tenant_request=instance, tenant__isnull=True).delete()
+
+
+@receiver([post_save, post_delete], sender=DomainReservation, dispatch_uid="customers_reservation_cache")
+def invalidate_availability(sender, instance, **kwargs):
+    forget_availability(instance.name)
+
+
+@receiver(user_logged_in, dispatch_uid="customers_tenant_last_login")
+def record_tenant_login(sender, request, user, **kwargs):
+    schema_name = getattr(connection, 'schema_name', None)
+    if schema_name and schema_name != get_public_schema_name():
+        usage_counters.touch_login(schema_name, timezone.now())
@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = getattr(settings, 'TENANT_STATUS_CHANNEL', 'tenant_status')
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7500
+
+
+def notify_status_change(changes):
+    """
+    Broadcasts tenant status changes to every worker.
+
+    param changes: iterable of (schema_name, status) pairs; a status of None
+    means the tenant was deleted.
+    NOTIFY is transactional, so workers only see the change once it commits.
+    """
+    batch, size = [], 2
+    with connection.cursor() as cursor:
+        for schema_name, status in changes:
+            item = [schema_name, status]
+            item_size = len(json.dumps(item)) + 1
+            if batch and size + item_size > MAX_PAYLOAD_BYTES:
+                cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, json.dumps(batch)])
+                batch, size = [], 2
+            batch.append(item)
+            size += item_size
+        if batch:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, json.dumps(batch)])
+
+
+class TenantStatusGate:
+    """
+    Per-worker snapshot of tenants that are not Active (Suspended/Cancelled),
+    kept current by a background thread that LISTENs on CHANNEL.
+    Lookups are a dict access, so the request path never reads Client.status.
+    """
+
+    def __init__(self, reconnect_delay=5):
+        self.reconnect_delay = reconnect_delay
+        self._blocked = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def blocked_status(self, schema_name):
+        """ Returns the tenant's status if it is not Active, else None. """
+        return self._blocked.get(schema_name)
+
+    def apply(self, changes):
+        blocked = dict(self._blocked)
+        for schema_name, status in changes:
+            if status is None or status == 'Active':
+                blocked.pop(schema_name, None)
+            else:
+                blocked[schema_name] = status
+        # Swap the whole dict so readers never need the lock
+        self._blocked = blocked
+
+    def load(self):
+        from .models import Client
+        rows = Client.objects.exclude(status='Active').values_list('schema_name', 'status')
+        self._blocked = {schema_name: status for schema_name, status in rows}
+
+    def ensure_started(self):
+        """ Starts the listener once per process (workers may be forked after import). """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.load()
+            if getattr(settings, 'TENANT_STATUS_LISTEN', True):
+                threading.Thread(target=self._listen_forever, name="tenant-status-listener", daemon=True).start()
+
+    def _listen_forever(self):
+        while True:
+            db = connections.create_connection(DEFAULT_DB_ALIAS)
+            try:
+                db.ensure_connection()
+                raw = db.connection
+                raw.autocommit = True
+                with raw.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{CHANNEL}"')
+                # Anything that changed while we were not listening is picked up here
+                self.load()
+                self._poll(raw)
+            except Exception:
+                logger.exception("Tenant status listener lost its connection, retrying.")
+            finally:
+                db.close()
+            time.sleep(self.reconnect_delay)
+
+    def _poll(self, raw):
+        if is_psycopg3:
+            while True:
+                for notify in raw.notifies(timeout=30):
+                    self.apply(json.loads(notify.payload))
+        while True:
+            if select.select([raw], [], [], 30) == ([], [], []):
+                continue
+            raw.poll()
+            while raw.notifies:
+                self.apply(json.loads(raw.notifies.pop(0).payload))
+
+
+tenant_status_gate = TenantStatusGate()
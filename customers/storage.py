@@ -0,0 +1,81 @@
+"""
+Storage usage per tenant: database schema size plus the media files it owns.
+
+Only TenantFileSystemStorage (with MEDIA_ROOT set) gives each tenant a media
+directory of its own. With plain FileSystemStorage all uploads share one
+tree, and the only file a tenant owns is its logo, so there is nothing to
+walk. Schema sizes for every tenant come from one catalog query. Media is walked
+with os.scandir, and each directory's (mtime, bytes of its own files,
+subdirectories) is cached between runs: a directory whose mtime has not
+changed is not listed again. A directory's mtime only changes when entries
+are added, removed or renamed, so files rewritten in place are picked up by
+a --full scan.
+"""
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection
+from django_tenants.files.storage import TenantFileSystemStorage
+
+
+def schema_sizes(schema_names):
+    """ Returns {schema_name: bytes} for tables, indexes and TOAST in each schema. """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT n.nspname, COALESCE(SUM(pg_total_relation_size(c.oid)), 0) "
+            "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relkind IN ('r', 'm') AND n.nspname = ANY(%s) "
+            "GROUP BY n.nspname",
+            [list(schema_names)],
+        )
+        return {schema_name: int(size) for schema_name, size in cursor.fetchall()}
+
+
+def tenant_media_dir(schema_name):
+    """ The tenant's own media directory, or None when uploads are not stored per tenant. """
+    if not settings.MEDIA_ROOT or not isinstance(default_storage, TenantFileSystemStorage):
+        return None
+    # Same layout as TenantFileSystemStorage, for a schema other than the current one
+    relative = getattr(settings, 'MULTITENANT_RELATIVE_MEDIA_ROOT', None) or '%s'
+    return os.path.abspath(os.path.join(settings.MEDIA_ROOT, relative % schema_name))
+
+
+def directory_size(root, cache, full=False):
+    """
+    Total bytes of the files under root.
+
+    param cache: {directory: [mtime_ns, own_bytes, subdirectory names]} from the
+    previous run; read only.
+    Returns (bytes, entries for every directory visited, directories listed).
+    """
+    total, listed, visited = 0, 0, {}
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        entry = None if full else cache.get(path)
+        if entry is None or entry[0] != mtime_ns:
+            own_bytes, subdirectories = 0, []
+            with os.scandir(path) as entries:
+                for item in entries:
+                    if item.is_dir(follow_symlinks=False):
+                        subdirectories.append(item.name)
+                    elif item.is_file(follow_symlinks=False):
+                        own_bytes += item.stat(follow_symlinks=False).st_size
+            entry = [mtime_ns, own_bytes, subdirectories]
+            listed += 1
+        visited[path] = entry
+        total += entry[1]
+        stack.extend(os.path.join(path, name) for name in entry[2])
+    return total, visited, listed
+
+
+def file_size(name):
+    try:
+        return os.stat(default_storage.path(name)).st_size
+    except (FileNotFoundError, NotImplementedError):
+        return 0
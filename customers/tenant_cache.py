@@ -0,0 +1,21 @@
+from django.conf import settings
+
+from core_app.lru import TTLCache
+
+
+class TenantCache(TTLCache):
+    """
+    Bounded in-process LRU map of hostname -> tenant.
+    Entries also expire after `ttl` seconds so other workers pick up
+    changes that were only invalidated in the process that made them.
+    """
+
+    def invalidate_tenant(self, tenant_pk):
+        """ Drops every hostname that resolves to the given tenant. """
+        self.invalidate_where(lambda hostname, tenant: tenant.pk == tenant_pk)
+
+
+tenant_cache = TenantCache(
+    max_size=getattr(settings, 'TENANT_CACHE_MAX_SIZE', 10000),
+    ttl=getattr(settings, 'TENANT_CACHE_TTL', 60),
+)
@@ -4,5 +4,7 @@ from django.contrib import admin
 
 urlpatterns=[
     path('create-tenant/', views.create_tenant, name='create_tenants'),
+    path('check-domain/', views.check_domain, name='check_domain'),
+    path('revenue/', views.revenue_dashboard, name='revenue_dashboard'),
     path('', views.index, name="index")
 ]
\ No newline at end of file
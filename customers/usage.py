@@ -0,0 +1,90 @@
+"""
+Incremental maintenance of the denormalized usage fields on Client.
+
+Tenant-side writes call usage_counters.add(schema_name, field=delta). Deltas
+are summed per tenant in memory and a background thread applies them all
+with one UPDATE per flush (F() + CASE per field). reconcile_usage_counters
+recomputes the values nightly and corrects any drift (e.g. deltas lost when
+a worker was killed).
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Case, DateTimeField, DecimalField, F, FloatField, IntegerField, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from core_app.flusher import WriteBehindBuffer
+from .models import Client
+
+COUNTER_FIELDS = {
+    'product_count': IntegerField(),
+    'order_count': IntegerField(),
+    'storage_used_mb': FloatField(),
+    'total_orders_value': DecimalField(max_digits=12, decimal_places=2),
+}
+
+
+class UsageCounters(WriteBehindBuffer):
+    thread_name = "usage-counters"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._deltas = {}
+        self._last_login = {}
+
+    def add(self, schema_name, **deltas):
+        with self.lock:
+            counters = self._deltas.setdefault(schema_name, {})
+            for field, delta in deltas.items():
+                if field not in COUNTER_FIELDS:
+                    raise ValueError(f"{field} is not a usage counter")
+                counters[field] = counters.get(field, 0) + delta
+            size = len(self._deltas) + len(self._last_login)
+        self.added(size)
+
+    def touch_login(self, schema_name, when):
+        with self.lock:
+            previous = self._last_login.get(schema_name)
+            if previous is None or when > previous:
+                self._last_login[schema_name] = when
+            size = len(self._deltas) + len(self._last_login)
+        self.added(size)
+
+    def take(self):
+        pending = (self._deltas, self._last_login)
+        self._deltas, self._last_login = {}, {}
+        return pending if any(pending) else None
+
+    def write(self, pending):
+        deltas, last_login = pending
+        updates = {}
+        for field, output_field in COUNTER_FIELDS.items():
+            whens = [
+                When(schema_name=schema_name, then=Value(counters[field], output_field=output_field))
+                for schema_name, counters in deltas.items()
+                if counters.get(field)
+            ]
+            if whens:
+                zero = Decimal(0) if isinstance(output_field, DecimalField) else 0
+                updates[field] = F(field) + Case(
+                    *whens, default=Value(zero, output_field=output_field), output_field=output_field
+                )
+        if last_login:
+            # Keeps the latest of the stored and the buffered time
+            updates['last_login'] = Case(
+                *[
+                    When(schema_name=schema_name, then=Greatest(Coalesce(F('last_login'), Value(when)), Value(when)))
+                    for schema_name, when in last_login.items()
+                ],
+                default=F('last_login'),
+                output_field=DateTimeField(),
+            )
+        if updates:
+            Client.objects.filter(schema_name__in=set(deltas) | set(last_login)).update(**updates)
+
+
+usage_counters = UsageCounters(
+    interval=getattr(settings, 'USAGE_COUNTERS_FLUSH_INTERVAL', 5),
+    max_pending=getattr(settings, 'USAGE_COUNTERS_MAX_PENDING', 1000),
+    enabled=getattr(settings, 'USAGE_COUNTERS_BUFFERED', True),
+)
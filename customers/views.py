@@ -1,7 +1,14 @@
 from django.shortcuts import render, redirect
 from django.http import JsonResponse, HttpResponse
 from datetime import date
-from .models import TenantRequest, Domain
+from django.db import transaction
+from django.views.decorators.http import require_GET
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Sum
+from django.utils import timezone
+from datetime import timedelta
+from .models import DailyRevenue, MonthlyRevenue, TenantRequest
+from .reservations import check_availability, is_valid_label, normalize_domain, reserve_domain
 from core_app.emails.utils import send_html_email
 
 def create_tenant(request):
@@ -19,21 +26,32 @@ def create_tenant(request):
         if not tenant_name or not domain_name:
             return JsonResponse({'error': 'Tenant name and Domain name are required!'}, status=400)
 
-        # Prevent duplicate domains
-        if Domain.objects.filter(domain=f"{domain_name}.localhost").exists() or TenantRequest.objects.filter(desired_domain=domain_name).exists():
-            return JsonResponse({'error': 'This domain name is already taken!'}, status=400)
-
-        # Store tenant request (pending approval)
-        TenantRequest.objects.create(
-            tenant_name=tenant_name,
-            desired_domain=domain_name,
-            plan_type=plan_type,
-            payment_mode=payment_mode,
-            payment_plan=payment_plan,
-            email=email,
-            company=company,
-            address=address
-        )
+        domain_name = normalize_domain(domain_name)
+        if not is_valid_label(domain_name):
+            return JsonResponse({'error': 'Domain name may only contain letters, digits and hyphens.'}, status=400)
+
+        # Store tenant request (pending approval). The reservation's unique index
+        # prevents duplicate domains, even between concurrent signups.
+        with transaction.atomic():
+            tenant_request = TenantRequest.objects.create(
+                tenant_name=tenant_name,
+                desired_domain=domain_name,
+                plan_type=plan_type,
+                payment_mode=payment_mode,
+                payment_plan=payment_plan,
+                email=email,
+                company=company,
+                address=address
+            )
+            reserved = reserve_domain(domain_name, tenant_request=tenant_request)
+            if not reserved:
+                transaction.set_rollback(True)
+        if not reserved:
+            # Outside the rolled-back block, where queries are allowed again
+            return JsonResponse({
+                'error': 'This domain name is already taken!',
+                'suggestions': check_availability(domain_name)['suggestions'],
+            }, status=400)
 
         send_html_email(
             subject="Your Tenant Request Has Been Received",
@@ -54,5 +72,52 @@ def create_tenant(request):
     return render(request, 'create_tenant.html')
 
 
+@require_GET
+def check_domain(request):
+    """ JSON availability check used by the signup form while the user types. """
+    name = normalize_domain(request.GET.get('name'))
+    if not is_valid_label(name):
+        return JsonResponse({'name': name, 'available': False, 'error': 'Invalid domain name.'}, status=400)
+    return JsonResponse({'name': name, **check_availability(name)})
+
+
 def index(request):
     return HttpResponse("<h1> Public Index </h1>")
+
+
+@staff_member_required
+def revenue_dashboard(request):
+    """
+    Super-admin revenue overview. Reads only the rollup tables maintained by
+    `manage.py refresh_revenue_rollups`, never the orders or payments themselves.
+    """
+    today = timezone.localdate()
+    first_month = (today.replace(day=1) - timedelta(days=335)).replace(day=1)
+    monthly = MonthlyRevenue.objects.filter(month__gte=first_month)
+    context = {
+        'months': (
+            monthly.filter(kind='Order')
+            .values('month', 'currency', 'status')
+            .annotate(count=Sum('count'), amount=Sum('amount'))
+            .order_by('-month', 'currency', 'status')
+        ),
+        'by_plan': (
+            monthly.filter(kind='Order', status='paid')
+            .values('plan__name', 'currency')
+            .annotate(count=Sum('count'), amount=Sum('amount'))
+            .order_by('currency', '-amount')
+        ),
+        'by_provider': (
+            monthly.filter(kind='Payment')
+            .values('provider', 'currency', 'status')
+            .annotate(count=Sum('count'), amount=Sum('amount'))
+            .order_by('provider', 'currency', 'status')
+        ),
+        'last_30_days': (
+            DailyRevenue.objects.filter(kind='Order', status='paid', day__gt=today - timedelta(days=30))
+            .values('day', 'currency')
+            .annotate(count=Sum('count'), amount=Sum('amount'))
+            .order_by('-day', 'currency')
+        ),
+    }
+    return render(request, 'revenue_dashboard.html', context)
@@ -0,0 +1,70 @@
+"""
+Per-worker unique-visitor sketches. The request hook folds a visitor hash into
+an in-memory HyperLogLog per (tenant, day); a background thread merges them
+into the VisitorSketch rows, so the request path never touches the database.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core_app.flusher import WriteBehindBuffer
+from .hll import HyperLogLog, hash64
+from .models import VisitorSketch
+
+
+class VisitorSketches(WriteBehindBuffer):
+    thread_name = "visitor-sketches"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._sketches = {}
+
+    def record(self, tenant_id, visitor):
+        hashed = hash64(visitor)
+        day = timezone.localdate()
+        with self.lock:
+            sketch = self._sketches.get((tenant_id, day))
+            if sketch is None:
+                sketch = self._sketches[(tenant_id, day)] = HyperLogLog()
+            sketch.add_hash(hashed)
+            size = len(self._sketches)
+        self.added(size)
+
+    def take(self):
+        pending, self._sketches = self._sketches, {}
+        return pending or None
+
+    def write(self, pending):
+        try:
+            self._merge(pending)
+        except IntegrityError:
+            # Another worker created one of the day rows first; it exists now, so merge into it
+            self._merge(pending)
+
+    def _merge(self, pending):
+        tenant_ids = {tenant_id for tenant_id, _ in pending}
+        days = {day for _, day in pending}
+        with transaction.atomic():
+            existing = {
+                (row.tenant_id, row.day): row
+                for row in VisitorSketch.objects.select_for_update().filter(tenant_id__in=tenant_ids, day__in=days)
+            }
+            changed, created = [], []
+            for key, sketch in pending.items():
+                row = existing.get(key)
+                if row is None:
+                    tenant_id, day = key
+                    created.append(VisitorSketch(tenant_id=tenant_id, day=day, registers=sketch.to_bytes()))
+                else:
+                    row.registers = HyperLogLog.union([bytes(row.registers), sketch.registers]).to_bytes()
+                    row.updated_on = timezone.now()
+                    changed.append(row)
+            VisitorSketch.objects.bulk_update(changed, ['registers', 'updated_on'])
+            VisitorSketch.objects.bulk_create(created)
+
+
+visitor_sketches = VisitorSketches(
+    interval=getattr(settings, 'VISITOR_SKETCH_FLUSH_INTERVAL', 60),
+    max_pending=getattr(settings, 'VISITOR_SKETCH_MAX_PENDING', 1000),
+    enabled=getattr(settings, 'VISITOR_SKETCH_BUFFERED', True),
+)
@@ -0,0 +1,62 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from core_app.benchmarks import format_latency, timed
+from core_app.emails.utils import send_html_email
+from mailer.models import OutboundEmail
+from mailer.sender import claim_batch, send_batch, to_message
+
+CONTEXT = {"name": "Bench", "tenant_name": "Bench", "domain": "bench", "company": "Bench", "email": "", "plan": "Basic"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures caller latency of queuing vs sending inline, and outbox drain throughput. "
+        "Run it against a development database and a local debugging SMTP server, "
+        "e.g. `python -m aiosmtpd -n -l localhost:1025`; it drains whatever is queued."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=1000)
+        parser.add_argument('--inline-sample', type=int, default=50, help="Messages to send inline for comparison.")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--smtp-host', default='localhost')
+        parser.add_argument('--smtp-port', type=int, default=1025)
+
+    def smtp(self, options):
+        return get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host=options['smtp_host'], port=options['smtp_port'],
+            username='', password='', use_tls=False, use_ssl=False,
+        )
+
+    def handle(self, *args, **options):
+        to_email = 'bench@example.com'
+        CONTEXT['email'] = to_email
+
+        # Old path: a fresh SMTP connection per message, on the caller's thread
+        inline = []
+        for _ in range(options['inline_sample']):
+            with self.smtp(options) as connection:
+                start = time.perf_counter_ns()
+                email = OutboundEmail(subject="Bench", to=[to_email], body="bench", html_body="<p>bench</p>")
+                connection.send_messages([to_message(email, connection)])
+                inline.append(time.perf_counter_ns() - start)
+        self.stdout.write(format_latency("inline send (new connection each)", inline))
+
+        queued = [
+            timed(send_html_email, "Bench", to_email, "emails/welcome.html", CONTEXT)[1]
+            for _ in range(options['messages'])
+        ]
+        self.stdout.write(format_latency("send_html_email (queued)", queued))
+
+        start = time.perf_counter()
+        sent = 0
+        with self.smtp(options) as connection:
+            while batch := claim_batch(options['batch_size']):
+                sent += send_batch(batch, connection)[0]
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"drained {sent} messages in {elapsed:.2f}s ({sent / elapsed:.0f} msg/s) over one connection")
+        OutboundEmail.objects.filter(subject="Bench", status='Sent').delete()
@@ -0,0 +1,73 @@
+import multiprocessing
+import time
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from mailer.models import OutboundEmail
+from mailer.sender import claim_batch, requeue_stale, send_batch
+
+
+def worker_loop(batch_size, once, poll_interval):
+    """ Drains the outbox, keeping one SMTP connection open while there is work. """
+    totals = [0, 0]
+    smtp = get_connection()
+    try:
+        while True:
+            batch = claim_batch(batch_size)
+            if not batch:
+                # Don't hold an idle connection for the server to time out
+                smtp.close()
+                if once:
+                    return totals
+                time.sleep(poll_interval)
+                continue
+            smtp.open()
+            sent, failed = send_batch(batch, smtp)
+            totals[0] += sent
+            totals[1] += failed
+    finally:
+        smtp.close()
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Delivers queued outbound email in batches, one SMTP connection per worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--once', action='store_true', help="Exit once the outbox is empty.")
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help="Seconds after which a Sending email is assumed to belong to a dead worker.")
+        parser.add_argument('--purge-sent-after', type=int, default=7, help="Delete sent email older than N days.")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale(timedelta(seconds=options['stale_after']))
+        if requeued:
+            self.stdout.write(f"Re-queued {requeued} stale email(s).")
+        purged, _ = OutboundEmail.objects.filter(
+            status='Sent', sent_on__lt=timezone.now() - timedelta(days=options['purge_sent_after'])
+        ).delete()
+
+        start = time.monotonic()
+        worker_args = (options['batch_size'], options['once'], options['poll_interval'])
+        if options['workers'] == 1:
+            sent, failed = worker_loop(*worker_args)
+        else:
+            # Forked workers must not share the parent's socket
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(processes=options['workers']) as pool:
+                results = [pool.apply_async(worker_loop, worker_args) for _ in range(options['workers'])]
+                totals = [result.get() for result in results]
+            sent, failed = sum(t[0] for t in totals), sum(t[1] for t in totals)
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            f"Sent {sent} email(s), {failed} failed, in {elapsed:.1f}s "
+            f"({sent / elapsed if elapsed else 0:.0f} msg/s). Purged {purged} old row(s)."
+        )
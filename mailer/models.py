@@ -0,0 +1,34 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """
+    Durable outbox row. send_html_email() only inserts these; the
+    `send_queued_email` workers deliver them in batches over one reused
+    SMTP connection and retry failures with backoff.
+    """
+    subject = models.CharField(max_length=255)
+    to = models.JSONField(help_text="List of recipient addresses.")
+    from_email = models.CharField(max_length=254, blank=True)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+
+    STATUS_CHOICES = [
+        ('Queued', 'Queued'),
+        ('Sending', 'Sending'),
+        ('Sent', 'Sent'),
+        ('Failed', 'Failed'),
+    ]
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Queued')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    created_on = models.DateTimeField(auto_now_add=True)
+    sent_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "send_after"])]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,137 @@
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, to, body, html_body='', from_email=None, send_after=None):
+    return OutboundEmail.objects.create(
+        subject=subject,
+        to=list(to),
+        from_email=from_email or '',
+        body=body,
+        html_body=html_body,
+        send_after=send_after or timezone.now(),
+    )
+
+
+def enqueue_many(messages, batch_size=500):
+    """ Bulk version of enqueue_email() for (subject, to, body, html_body) tuples. """
+    now = timezone.now()
+    return OutboundEmail.objects.bulk_create(
+        [
+            OutboundEmail(subject=subject, to=list(to), body=body, html_body=html_body, send_after=now)
+            for subject, to, body, html_body in messages
+        ],
+        batch_size=batch_size,
+    )
+
+
+def requeue_stale(stale_after):
+    """
+    Puts back emails whose worker died mid-batch (they may be delivered twice).
+    Counts that as an attempt, so an email that keeps killing its worker ends up Failed.
+    """
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 6)
+    stale = OutboundEmail.objects.filter(status='Sending', send_after__lt=timezone.now() - stale_after)
+    stale.filter(attempts__gte=max_attempts - 1).update(
+        status='Failed', attempts=F('attempts') + 1, last_error='Worker died while sending.'
+    )
+    return stale.update(status='Queued', attempts=F('attempts') + 1)
+
+
+def claim_batch(size):
+    """ Locks up to `size` due emails for this worker and marks them Sending. """
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='Queued', send_after__lte=timezone.now())
+            .order_by('send_after')[:size]
+        )
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                status='Sending', send_after=timezone.now()
+            )
+    return batch
+
+
+def to_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def record_failure(email, error, max_attempts):
+    """ Counts a failed attempt and schedules the retry, or gives up after max_attempts. """
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= max_attempts:
+        email.status = 'Failed'
+    else:
+        email.status = 'Queued'
+        email.send_after = timezone.now() + timedelta(seconds=30 * 2 ** (email.attempts - 1))
+    email.save(update_fields=['attempts', 'last_error', 'status', 'send_after'])
+    logger.warning("Email %s failed (attempt %s): %s", email.pk, email.attempts, error)
+
+
+def send_batch(batch, connection=None):
+    """
+    Delivers a claimed batch over a single SMTP connection.
+    Returns (sent, failed) counts; failures are retried with exponential backoff.
+
+    Any exception while building or sending a message is a failure of that
+    email only, and emails already delivered are marked Sent even if the rest
+    of the batch blows up, so nothing is left in Sending to be re-sent.
+    """
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 6)
+    connection = connection or get_connection()
+    sent_ids, failed = [], 0
+    opened = connected = False
+    try:
+        for index, email in enumerate(batch):
+            if not connected:
+                try:
+                    # open() is a no-op on a connection the caller keeps open across batches
+                    opened = connection.open() or opened
+                    connected = True
+                except Exception as e:
+                    # No connection: every email left in the batch counts a failed attempt
+                    for email in batch[index:]:
+                        record_failure(email, e, max_attempts)
+                    failed += len(batch) - index
+                    break
+            try:
+                connection.send_messages([to_message(email, connection)])
+            except Exception as e:
+                failed += 1
+                record_failure(email, e, max_attempts)
+                if isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                    # Reconnect before the next email
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                    connected = False
+            else:
+                sent_ids.append(email.pk)
+    finally:
+        OutboundEmail.objects.filter(pk__in=sent_ids).update(status='Sent', sent_on=timezone.now(), last_error='')
+        if opened:
+            connection.close()
+    return len(sent_ids), failed
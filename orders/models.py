@@ -47,6 +47,8 @@ class SubscriptionOrder(models.Model):
     currency = models.CharField(max_length=10, default="INR")
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Moves on every save, so revenue rollups can pick up status changes incrementally
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     #Lifecycle tracking
     STATUS_CHOICES = [
@@ -135,7 +137,7 @@ class Payment(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     #Optionally store raw gateway response for debugging
     raw_response = models.JSONField(
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django_tenants.utils import get_public_schema_name
+
+from customers.usage import usage_counters
+from .models import SubscriptionOrder
+
+
+def current_tenant_schema():
+    schema_name = getattr(connection, 'schema_name', None)
+    if schema_name and schema_name != get_public_schema_name():
+        return schema_name
+    return None
+
+
+@receiver(post_init, sender=SubscriptionOrder, dispatch_uid="orders_remember_status")
+def remember_status(sender, instance, **kwargs):
+    # Lets post_save see whether this save is the one that marked the order paid
+    instance._usage_paid = instance.status == "paid"
+
+
+@receiver(post_save, sender=SubscriptionOrder, dispatch_uid="orders_usage_save")
+def count_order(sender, instance, created, **kwargs):
+    schema_name = current_tenant_schema()
+    if schema_name is None:
+        return
+    deltas = {}
+    if created:
+        deltas['order_count'] = 1
+    paid = instance.status == "paid"
+    if paid != instance._usage_paid:
+        amount = Decimal(instance.amount)
+        deltas['total_orders_value'] = amount if paid else -amount
+        instance._usage_paid = paid
+    if deltas:
+        usage_counters.add(schema_name, **deltas)
+
+
+@receiver(post_delete, sender=SubscriptionOrder, dispatch_uid="orders_usage_delete")
+def uncount_order(sender, instance, **kwargs):
+    schema_name = current_tenant_schema()
+    if schema_name is None:
+        return
+    deltas = {'order_count': -1}
+    if instance._usage_paid:
+        deltas['total_orders_value'] = -Decimal(instance.amount)
+    usage_counters.add(schema_name, **deltas)